@@ -4,13 +4,22 @@ Disk cache utilities for parsed session records and derived metadata snapshots.
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
+import operator
 import os
 import sys
+import threading
+import zlib
+from array import array
+from collections.abc import Callable, Collection, ItemsView, Iterable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as futures_wait
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, TypeVar
 
 from .model import (
     Message,
@@ -19,16 +28,51 @@ from .model import (
     NormalizedPart,
     SessionRecord,
 )
-from .util import parse_timestamp
+from .util import intern_labels, intern_names, parse_timestamp
 
-SESSION_CACHE_VERSION = 1
-METADATA_CACHE_VERSION = 1
-METADATA_SCHEMA_VERSION = 1
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+try:
+    from . import cache_structs
+except ImportError:  # pragma: no cover - optional speedup (requires msgspec)
+    cache_structs = None  # type: ignore[assignment]
+
+SESSION_CACHE_VERSION = 6
+METADATA_CACHE_VERSION = 2
+METADATA_SCHEMA_VERSION = 4
 WORKSPACE_CACHE_DIRNAME = ".agent-sessions-cache"
+SESSION_INDEX_FILENAME = "session_index.jsonl"
+SESSION_ENTRIES_DIRNAME = "session_entries"
+SESSION_SHARD_COMPRESSION_LEVEL = 3
+# Preset dictionary for shard compression: shards are small, so seeding zlib with
+# the keys every payload repeats buys most of the ratio a trained dictionary would.
+# Changing it invalidates existing shards, so bump SESSION_CACHE_VERSION with it.
+_SHARD_ZDICT = (
+    b'"tool_name":"arguments":"output":"language":"kind":["text","code",'
+    b'"tool-call","tool-result"],"provider_meta":"latency_ms":"timestamp":'
+    b'"normalized_messages":"normalization_diagnostics":"total_events":'
+    b'"parsed_events":"skipped_events":"warnings":"created_at":"content":'
+    b'"role":"user","role":"assistant","messages":"working_dir":"model":'
+    b'"started_at":"updated_at":"session_id":"source_path":"provider":'
+    b'"session":{"id":"name":null,'
+)
+
+# Snapshot layouts load() still understands: 1 is a single JSON document,
+# 2 is JSON lines.
+_METADATA_READABLE_VERSIONS = frozenset({1, METADATA_CACHE_VERSION})
 
 # Backward-compatible alias used by older tests/imports.
 CACHE_VERSION = SESSION_CACHE_VERSION
 
+_T = TypeVar("_T")
+
+# Manifest keys are unique, so ordering items by key alone matches a full sort
+# without ever comparing the fingerprint tuples.
+_MANIFEST_SORT_KEY = operator.itemgetter(0)
+
 MetadataCacheStatus = Literal[
     "hit",
     "miss",
@@ -65,21 +109,28 @@ class MetadataCachePersistResult:
 
 
 def default_cache_dir() -> Path:
-    xdg_cache = os.getenv("XDG_CACHE_HOME")
+    return _default_cache_dir_for(os.getenv("XDG_CACHE_HOME"), os.path.expanduser("~"))
+
+
+@functools.lru_cache(maxsize=8)
+def _default_cache_dir_for(xdg_cache: str | None, home: str) -> Path:
     if xdg_cache:
         return Path(xdg_cache) / "agent-sessions"
     if sys.platform == "darwin":
-        return Path.home() / "Library" / "Caches" / "agent-sessions"
-    return Path.home() / ".cache" / "agent-sessions"
+        return Path(home) / "Library" / "Caches" / "agent-sessions"
+    return Path(home) / ".cache" / "agent-sessions"
 
 
 def cache_disabled() -> bool:
-    return os.getenv("AGENT_SESSIONS_DISABLE_DISK_CACHE", "").lower() in {
-        "1",
-        "true",
-        "yes",
-        "on",
-    }
+    return _env_flag("AGENT_SESSIONS_DISABLE_DISK_CACHE")
+
+
+def cache_fsync_enabled() -> bool:
+    return _env_flag("AGENT_SESSIONS_CACHE_FSYNC")
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in {"1", "true", "yes", "on"}
 
 
 def cache_dir_from_env() -> Path:
@@ -90,12 +141,27 @@ def cache_dir_from_env() -> Path:
 
 
 def metadata_cache_dir_candidates() -> list[Path]:
+    # Candidates only depend on these inputs, so the expand/normcase/dedupe
+    # pass runs once per distinct environment rather than per cache instance.
+    return list(
+        _metadata_cache_dir_candidates_for(
+            os.getenv("AGENT_SESSIONS_CACHE_DIR", "").strip(),
+            os.getenv("XDG_CACHE_HOME"),
+            os.path.expanduser("~"),
+            os.getcwd(),
+        )
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _metadata_cache_dir_candidates_for(
+    env_value: str, xdg_cache: str | None, home: str, cwd: str
+) -> tuple[Path, ...]:
     candidates: list[Path] = []
-    env_value = os.getenv("AGENT_SESSIONS_CACHE_DIR", "").strip()
     if env_value:
         candidates.append(Path(env_value).expanduser())
-    candidates.append(default_cache_dir())
-    candidates.append(Path.cwd() / WORKSPACE_CACHE_DIRNAME)
+    candidates.append(_default_cache_dir_for(xdg_cache, home))
+    candidates.append(Path(cwd) / WORKSPACE_CACHE_DIRNAME)
 
     unique: list[Path] = []
     seen: set[str] = set()
@@ -108,31 +174,249 @@ def metadata_cache_dir_candidates() -> list[Path]:
             continue
         seen.add(normalized)
         unique.append(path)
-    return unique
+    return tuple(unique)
 
 
-def path_fingerprint(path: Path) -> tuple[int, int] | None:
+def path_fingerprint(path: str | os.PathLike[str]) -> tuple[int, int] | None:
     try:
-        stat = path.stat()
+        stat = os.stat(path)
     except OSError:
         return None
     return stat.st_mtime_ns, stat.st_size
 
 
+def batch_fingerprints(paths: Iterable[str | os.PathLike[str]]) -> dict[str, tuple[int, int]]:
+    """
+    Fingerprint ``paths`` with one ``os.scandir`` per parent directory.
+
+    Returns ``{str(path): (mtime_ns, size)}`` for the paths that exist. If a
+    directory cannot be listed its paths are stat'ed individually instead.
+    Directories are scanned concurrently, since the stat calls release the GIL.
+    """
+    by_parent: dict[str, dict[str, str]] = {}
+    split = os.path.split
+    for path in paths:
+        path = os.fspath(path)
+        parent, name = split(path)
+        by_parent.setdefault(parent, {})[name] = path
+    fingerprints: dict[str, tuple[int, int]] = {}
+    if len(by_parent) > 1:
+        for found in _stat_pool().map(_scan_fingerprints, by_parent.items()):
+            fingerprints.update(found)
+    else:
+        for item in by_parent.items():
+            fingerprints.update(_scan_fingerprints(item))
+    return fingerprints
+
+
+def _scan_fingerprints(item: tuple[str, dict[str, str]]) -> list[tuple[str, tuple[int, int]]]:
+    parent, wanted = item
+    found: list[tuple[str, tuple[int, int]]] = []
+    try:
+        with os.scandir(parent) as entries:
+            for entry in entries:
+                path = wanted.get(entry.name)
+                if path is None:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                found.append((path, (stat.st_mtime_ns, stat.st_size)))
+    except OSError:
+        for path in wanted.values():
+            fingerprint = path_fingerprint(path)
+            if fingerprint is not None:
+                found.append((path, fingerprint))
+    return found
+
+
+_STAT_POOL: ThreadPoolExecutor | None = None
+_STAT_POOL_LOCK = threading.Lock()
+_READAHEAD_POOL: ThreadPoolExecutor | None = None
+_FADV_WILLNEED: int | None = getattr(os, "POSIX_FADV_WILLNEED", None)
+# Per-call limits on readahead(): hints past these would mostly evict pages
+# read for earlier files before the parser gets to them.
+_READAHEAD_MAX_FILES = 256
+_READAHEAD_MAX_BYTES = 256 << 20
+
+
+def _stat_pool() -> ThreadPoolExecutor:
+    global _STAT_POOL
+    with _STAT_POOL_LOCK:
+        if _STAT_POOL is None:
+            _STAT_POOL = ThreadPoolExecutor(
+                max_workers=min(8, (os.cpu_count() or 1) * 2),
+                thread_name_prefix="agent-sessions-stat",
+            )
+        return _STAT_POOL
+
+
+def _readahead_pool() -> ThreadPoolExecutor:
+    global _READAHEAD_POOL
+    with _STAT_POOL_LOCK:
+        if _READAHEAD_POOL is None:
+            _READAHEAD_POOL = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="agent-sessions-readahead"
+            )
+        return _READAHEAD_POOL
+
+
+def readahead(sizes: Mapping[str, int]) -> None:
+    """
+    Hint the kernel to start reading the files in ``sizes`` into the page cache.
+
+    ``sizes`` maps paths to their byte sizes, in the order they will be read.
+    Only the leading files within _READAHEAD_MAX_FILES and _READAHEAD_MAX_BYTES
+    are hinted. Best effort: the hints go out on a dedicated thread, so neither
+    the caller nor batch_fingerprints() waits on them, and this is a no-op
+    without ``posix_fadvise``.
+    """
+    if _FADV_WILLNEED is None or not sizes:
+        return
+    batch: list[str] = []
+    budget = _READAHEAD_MAX_BYTES
+    for path, size in sizes.items():
+        if len(batch) >= _READAHEAD_MAX_FILES or size > budget:
+            break
+        budget -= size
+        batch.append(path)
+    if batch:
+        _readahead_pool().submit(_advise_willneed, batch)
+
+
+def _advise_willneed(paths: list[str]) -> None:
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, _FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def path_content_hash(path: Path) -> str | None:
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class SnapshotManifest(Mapping[tuple[str, str], tuple[int, int]]):
+    """
+    Read-only manifest loaded from a metadata snapshot, stored column-wise.
+
+    Providers and paths are parallel lists and fingerprints live in two int64
+    arrays, instead of a tuple key, a tuple value and a dict slot per file.
+    The key-to-row index is only built if something looks entries up by key.
+    """
+
+    __slots__ = ("_providers", "_paths", "_mtimes", "_sizes", "_index")
+
+    def __init__(self) -> None:
+        self._providers: list[str] = []
+        self._paths: list[str] = []
+        self._mtimes = array("q")
+        self._sizes = array("q")
+        self._index: dict[tuple[str, str], int] | None = None
+
+    def append(self, provider: str, source_path: str, mtime_ns: int, size: int) -> None:
+        self._mtimes.append(mtime_ns)
+        try:
+            self._sizes.append(size)
+        except OverflowError:
+            self._mtimes.pop()
+            raise
+        self._providers.append(provider)
+        self._paths.append(source_path)
+        self._index = None
+
+    def __getitem__(self, key: tuple[str, str]) -> tuple[int, int]:
+        index = self._index
+        if index is None:
+            index = self._index = {
+                item: row for row, item in enumerate(zip(self._providers, self._paths, strict=True))
+            }
+        row = index[key]
+        return self._mtimes[row], self._sizes[row]
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        return zip(self._providers, self._paths, strict=True)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def items(self) -> ItemsView[tuple[str, str], tuple[int, int]]:
+        return _SnapshotManifestItems(self)
+
+    def _iter_items(self) -> Iterator[tuple[tuple[str, str], tuple[int, int]]]:
+        keys = zip(self._providers, self._paths, strict=True)
+        return zip(keys, zip(self._mtimes, self._sizes, strict=True), strict=True)
+
+
+class _SnapshotManifestItems(ItemsView[tuple[str, str], tuple[int, int]]):
+    # Walk the columns directly instead of looking every key back up.
+    _mapping: SnapshotManifest
+
+    def __iter__(self) -> Iterator[tuple[tuple[str, str], tuple[int, int]]]:
+        return self._mapping._iter_items()
+
+
 @dataclass(frozen=True)
 class CachedMetadataSnapshot:
     cache_key: str
     manifest_hash: str
-    manifest: dict[tuple[str, str], tuple[int, int]]
+    manifest: Mapping[tuple[str, str], tuple[int, int]]
     sessions: list[SessionRecord]
 
 
 class DiskSessionCache:
+    """
+    Per-file cache of parsed session records.
+
+    Each record lives in its own shard under ``session_entries/`` so a store
+    only rewrites the sessions that changed; ``session_index.jsonl`` maps cache
+    keys to shard names and the source fingerprint they were built from. The
+    index is an append-only log (later lines win) that is compacted once stale
+    lines outnumber live entries.
+    """
+
     def __init__(self, cache_dir: Path, *, enabled: bool = True) -> None:
         self.enabled = enabled
         self.cache_dir = cache_dir
-        self.cache_path = cache_dir / "session_cache.json"
+        self.cache_path = cache_dir / SESSION_INDEX_FILENAME
+        self.entries_dir = cache_dir / SESSION_ENTRIES_DIRNAME
         self._entries: dict[str, dict[str, Any]] = {}
+        # Serialized sessions awaiting a shard write on the next persist().
+        self._dirty: dict[str, dict[str, Any]] = {}
+        # Index entries changed since the last persist(), and how many entry
+        # lines the on-disk log currently holds (None when it must be rewritten).
+        self._index_pending: set[str] = set()
+        self._index_lines: int | None = None
+        # Fingerprint of session_index.jsonl as last read or written here;
+        # refresh() re-reads the index when another process has changed it.
+        self._index_stamp: tuple[int, int] | None = None
+        # Records already decoded or stored by this instance, with the source
+        # fingerprint they were built from. A long-lived cache hands these back
+        # for unchanged files instead of re-reading and re-decoding the shard.
+        self._records: dict[str, tuple[int, int, SessionRecord]] = {}
+        # Fingerprints gathered by prime(), keyed by str(path). Thread-local so
+        # providers scanning concurrently against one cache keep their own.
+        self._primed = threading.local()
+        # _lock guards the in-memory maps; _persist_lock serializes writers so a
+        # background persist and a foreground one never interleave file writes.
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._writing: dict[str, dict[str, Any]] = {}
+        self._pending_persist: Future[None] | None = None
 
     @classmethod
     def from_env(cls) -> DiskSessionCache:
@@ -143,67 +427,327 @@ class DiskSessionCache:
     def load(self) -> None:
         if not self.enabled:
             return
-        payload = _load_json_payload(self.cache_path)
-        if not isinstance(payload, dict):
+        wait_for_background_writes()
+        loaded = self._read_index()
+        if loaded is None:
             return
-        if payload.get("version") != SESSION_CACHE_VERSION:
+        self._index_stamp, entries, self._index_lines = loaded
+        self._entries = entries
+
+    def refresh(self) -> bool:
+        """
+        Re-read the index if its size or mtime changed since it was last read.
+
+        Picks up entries appended by other processes sharing the cache
+        directory. Entries this instance has not persisted yet are kept.
+        Returns True when the index was re-read.
+        """
+        if not self.enabled or path_fingerprint(self.cache_path) == self._index_stamp:
+            return False
+        with self._persist_lock:
+            loaded = self._read_index()
+            if loaded is None:
+                return False
+            stamp, entries, lines = loaded
+            with self._lock:
+                for key in (*self._index_pending, *self._dirty, *self._writing):
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        entries[key] = entry
+                self._entries = entries
+                self._index_lines = lines
+                self._index_stamp = stamp
+        return True
+
+    def retain(self, live_sources: Mapping[str, Collection[str]]) -> None:
+        """
+        Drop entries and decoded records for sources that no longer exist.
+
+        ``live_sources`` maps provider names to the source paths they
+        currently report; providers missing from it are left untouched.
+        Entries with unpersisted changes are kept.
+        """
+        if not self.enabled:
             return
-        entries = payload.get("entries")
-        if isinstance(entries, list):
-            self._entries = {
-                self._entry_key(item.get("provider"), item.get("source_path")): item
-                for item in entries
-                if isinstance(item, dict)
+        with self._lock:
+            unsaved = self._index_pending | self._dirty.keys() | self._writing.keys()
+            for key in [*self._entries, *self._records]:
+                provider, _sep, source_path = key.partition("::")
+                sources = live_sources.get(provider)
+                if sources is None or source_path in sources or key in unsaved:
+                    continue
+                self._entries.pop(key, None)
+                self._records.pop(key, None)
+
+    def _read_index(
+        self,
+    ) -> tuple[tuple[int, int] | None, dict[str, dict[str, Any]], int] | None:
+        # Stat before reading: a write racing the read then leaves a stale
+        # stamp, and the next refresh() reads the index again.
+        stamp = path_fingerprint(self.cache_path)
+        try:
+            lines = self.cache_path.read_bytes().splitlines()
+        except OSError:
+            return None
+        if not lines:
+            return None
+        try:
+            header = _loads_json(lines[0])
+        except ValueError:
+            return None
+        if not isinstance(header, dict) or header.get("version") != SESSION_CACHE_VERSION:
+            return None
+        entries: dict[str, dict[str, Any]] = {}
+        for line in lines[1:]:
+            try:
+                item = _loads_json(line)
+            except ValueError:
+                # A torn append only loses that entry; the source gets re-parsed.
+                continue
+            if (
+                isinstance(item, dict)
                 and isinstance(item.get("provider"), str)
                 and isinstance(item.get("source_path"), str)
-            }
+                and isinstance(item.get("shard"), str)
+            ):
+                entries[self._entry_key(item["provider"], item["source_path"])] = item
+        return stamp, entries, len(lines) - 1
+
+    def prime(self, paths: Iterable[Path], provider: str | None = None) -> None:
+        """
+        Stat ``paths`` up front, one directory scan per parent.
+
+        lookup() and store() on the calling thread reuse these fingerprints
+        until discard_primed() is called, so a miss no longer stats the source
+        file twice. With ``provider``, sources the cache cannot serve are also
+        passed to readahead() so their reads start before the parser needs them.
+        """
+        if not self.enabled:
+            self._primed.fingerprints = {}
+            return
+        fingerprints = batch_fingerprints(paths)
+        self._primed.fingerprints = fingerprints
+        if provider is None:
+            return
+        records = self._records
+        entries = self._entries
+        stale: dict[str, int] = {}
+        for source_path, fingerprint in fingerprints.items():
+            key = self._entry_key(provider, source_path)
+            decoded = records.get(key)
+            if decoded is not None and decoded[:2] == fingerprint:
+                continue
+            entry = entries.get(key)
+            if entry and (entry.get("mtime_ns"), entry.get("size")) == fingerprint:
+                continue
+            stale[source_path] = fingerprint[1]
+        readahead(stale)
+
+    def discard_primed(self) -> None:
+        self._primed.fingerprints = {}
+
+    def _fingerprint(self, path: Path, source_path: str) -> tuple[int, int] | None:
+        primed = getattr(self._primed, "fingerprints", None)
+        if primed:
+            fingerprint = primed.get(source_path)
+            if fingerprint is not None:
+                return fingerprint
+        return path_fingerprint(path)
 
     def lookup(self, provider: str, path: Path) -> SessionRecord | None:
         if not self.enabled:
             return None
-        fingerprint = path_fingerprint(path)
+        source_path = str(path)
+        fingerprint = self._fingerprint(path, source_path)
         if fingerprint is None:
             return None
-        key = self._entry_key(provider, str(path))
+        key = self._entry_key(provider, source_path)
+        mtime_ns, size = fingerprint
+        decoded = self._records.get(key)
+        if decoded is not None and decoded[0] == mtime_ns and decoded[1] == size:
+            return decoded[2]
         entry = self._entries.get(key)
         if not entry:
             return None
-        cached_mtime = entry.get("mtime_ns")
-        cached_size = entry.get("size")
-        if (cached_mtime, cached_size) != fingerprint:
+        if entry.get("size") != size:
             return None
-        session = entry.get("session")
+        if entry.get("mtime_ns") != mtime_ns:
+            # Same size but a new mtime (touch, checkout, epoch-mtime stores):
+            # fall back to the content hash and refresh the fingerprint on a match.
+            cached_hash = entry.get("content_hash")
+            if not cached_hash or path_content_hash(path) != cached_hash:
+                return None
+            with self._lock:
+                # Swap in an updated copy so a writer serializing the old entry
+                # never sees it change, and skip it if a store() replaced it.
+                if self._entries.get(key) is entry:
+                    entry = {**entry, "mtime_ns": mtime_ns}
+                    self._entries[key] = entry
+                    self._index_pending.add(key)
+        session = self._dirty.get(key) or self._writing.get(key)
+        if session is None:
+            session = self._read_shard(key, entry)
         if not isinstance(session, dict):
             return None
-        return deserialize_session_record(session)
+        record = deserialize_session_record(session)
+        with self._lock:
+            self._records[key] = (mtime_ns, size, record)
+        return record
 
     def store(self, provider: str, path: Path, record: SessionRecord) -> None:
         if not self.enabled:
             return
-        fingerprint = path_fingerprint(path)
+        source_path = str(path)
+        fingerprint = self._fingerprint(path, source_path)
         if fingerprint is None:
             return
         mtime_ns, size = fingerprint
-        key = self._entry_key(provider, str(path))
-        self._entries[key] = {
+        key = self._entry_key(provider, source_path)
+        previous = self._entries.get(key)
+        unchanged = (
+            previous is not None
+            and previous.get("mtime_ns") == mtime_ns
+            and previous.get("size") == size
+        )
+        if unchanged and (key in self._dirty or key in self._writing):
+            # Same source already queued for writing; nothing new to serialize.
+            return
+        content_hash = previous.get("content_hash") if unchanged and previous else None
+        entry = {
             "provider": provider,
-            "source_path": str(path),
+            "source_path": source_path,
             "mtime_ns": mtime_ns,
             "size": size,
-            "session": serialize_session_record(record),
+            "content_hash": content_hash or path_content_hash(path),
+            # The shard name is a pure function of the key; reuse it when known.
+            "shard": (previous and previous.get("shard")) or _shard_name(key),
         }
+        session = serialize_session_record(record)
+        with self._lock:
+            self._entries[key] = entry
+            self._dirty[key] = session
+            self._index_pending.add(key)
+            self._records[key] = (mtime_ns, size, record)
 
     def persist(self) -> None:
         if not self.enabled:
             return
-        payload = {
+        with self._persist_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+                pending_keys, self._index_pending = self._index_pending, set()
+                entries = dict(self._entries)
+                self._writing = dirty
+            stamp_before = path_fingerprint(self.cache_path)
+            try:
+                ok = self._write_changes(dirty, pending_keys, entries)
+            finally:
+                with self._lock:
+                    self._writing = {}
+            if ok and pending_keys and stamp_before == self._index_stamp:
+                # Only our own write changed the index since it was read, so
+                # the next refresh() has nothing new to pick up.
+                self._index_stamp = path_fingerprint(self.cache_path)
+            if not ok:
+                # Disk cache is best-effort, and a failed write (disk full, a
+                # lost rename race) is often transient: requeue what did not
+                # land for the next persist instead of turning the cache off.
+                with self._lock:
+                    for key, session in dirty.items():
+                        self._dirty.setdefault(key, session)
+                    self._index_pending |= pending_keys
+
+    def persist_async(self) -> Future[None]:
+        """
+        Schedule persist() on the shared background writer.
+
+        Calls made while an earlier request is still queued coalesce into it;
+        the writer thread is joined at interpreter exit, so queued writes land.
+        """
+        with self._lock:
+            pending = self._pending_persist
+            if pending is not None and not pending.running() and not pending.done():
+                return pending
+            future = _submit_background_write(self.persist)
+            self._pending_persist = future
+            return future
+
+    def flush(self, timeout: float | None = None) -> None:
+        pending = self._pending_persist
+        if pending is not None:
+            pending.result(timeout=timeout)
+
+    def _write_changes(
+        self,
+        dirty: dict[str, dict[str, Any]],
+        pending_keys: set[str],
+        entries: dict[str, dict[str, Any]],
+    ) -> bool:
+        for key, session in dirty.items():
+            entry = entries.get(key)
+            if entry is None:
+                continue
+            shard_path = self._shard_path(entry["shard"])
+            payload = {
+                "provider": entry["provider"],
+                "source_path": entry["source_path"],
+                "session": session,
+            }
+            data = _compress_shard(_dumps_json(payload))
+            if not _atomic_write_bytes(shard_path.parent, shard_path, data):
+                return False
+
+        if not pending_keys:
+            return True
+        pending = [entries[key] for key in pending_keys if key in entries]
+        if self._index_lines is None or (self._index_lines + len(pending) > 2 * len(entries) + 64):
+            return self._rewrite_index(entries)
+        return self._append_index(pending)
+
+    def _rewrite_index(self, entries: dict[str, dict[str, Any]]) -> bool:
+        header = {
             "version": SESSION_CACHE_VERSION,
             "updated_at": datetime.now(timezone.utc).isoformat(),
-            "entries": list(self._entries.values()),
         }
-        if not _atomic_write_json(self.cache_dir, self.cache_path, payload):
-            # Disk cache is best-effort; keep in-memory usage functional.
-            self.enabled = False
+        chunks = [_dumps_json(header), b"\n"]
+        for item in entries.values():
+            chunks += (_dumps_json(item), b"\n")
+        ok, _error = _atomic_write_chunks_with_error(self.cache_dir, self.cache_path, chunks)
+        if not ok:
+            return False
+        self._index_lines = len(entries)
+        return True
+
+    def _append_index(self, entries: list[dict[str, Any]]) -> bool:
+        data = b"".join(_dumps_json(item) + b"\n" for item in entries)
+        try:
+            with self.cache_path.open("ab") as handle:
+                handle.write(data)
+        except OSError:
+            # A partial append may end in a torn line; rewrite it next time.
+            self._index_lines = None
+            return False
+        self._index_lines = (self._index_lines or 0) + len(entries)
+        return True
+
+    def _read_shard(self, key: str, entry: dict[str, Any]) -> Any:
+        shard = entry.get("shard")
+        if not isinstance(shard, str):
+            return None
+        try:
+            raw = self._shard_path(shard).read_bytes()
+            payload = _loads_json(_decompress_shard(raw))
+        except (OSError, ValueError, zlib.error):
+            return None
+        if not isinstance(payload, dict):
+            return None
+        # Guard against stale or colliding shards before trusting the payload.
+        if self._entry_key(payload.get("provider"), payload.get("source_path")) != key:
+            return None
+        return payload.get("session")
+
+    def _shard_path(self, shard: str) -> Path:
+        return self.entries_dir / shard[:2] / f"{shard}.json.z"
 
     @staticmethod
     def _entry_key(provider: str | None, source_path: str | None) -> str:
@@ -222,6 +766,9 @@ class DiskMetadataCache:
         self.cache_dir = cache_dir
         self.cache_path = cache_dir / "metadata_snapshot.json"
         self._cache_dirs = list(cache_dirs) if cache_dirs is not None else [cache_dir]
+        self._last_loaded: (
+            tuple[tuple[Path, tuple[int, int], str], CachedMetadataSnapshot] | None
+        ) = None
 
     @classmethod
     def from_env(cls) -> DiskMetadataCache:
@@ -240,56 +787,70 @@ class DiskMetadataCache:
                 cache_path=None,
             )
 
+        # Writes queued by this process must land before we read them back.
+        wait_for_background_writes()
         attempts: list[MetadataCacheAttempt] = []
         saw_failure = False
 
         for idx, cache_dir in enumerate(self._cache_dirs):
             cache_path = cache_dir / "metadata_snapshot.json"
-            payload, error = _load_json_payload_with_error(cache_path)
-            if error is not None:
-                if isinstance(error, FileNotFoundError):
+            fingerprint = path_fingerprint(cache_path)
+            memo = self._last_loaded
+            if (
+                fingerprint is not None
+                and memo is not None
+                and memo[0] == (cache_path, fingerprint, cache_key)
+            ):
+                # Unchanged since we last parsed it: skip the read and decode.
+                snapshot = memo[1]
+            else:
+                payload, error = _load_metadata_payload_with_error(cache_path)
+                if error is not None:
+                    if isinstance(error, FileNotFoundError):
+                        attempts.append(
+                            MetadataCacheAttempt(
+                                cache_dir=cache_dir,
+                                cache_path=cache_path,
+                                outcome="miss",
+                            )
+                        )
+                        continue
+                    saw_failure = True
                     attempts.append(
                         MetadataCacheAttempt(
                             cache_dir=cache_dir,
                             cache_path=cache_path,
-                            outcome="miss",
+                            outcome="error",
+                            error_type=type(error).__name__,
+                            error_message=str(error),
                         )
                     )
                     continue
-                saw_failure = True
-                attempts.append(
-                    MetadataCacheAttempt(
-                        cache_dir=cache_dir,
-                        cache_path=cache_path,
-                        outcome="error",
-                        error_type=type(error).__name__,
-                        error_message=str(error),
-                    )
-                )
-                continue
 
-            snapshot, outcome, reason = _parse_metadata_snapshot(payload, cache_key)
-            if snapshot is None:
-                if outcome == "miss":
+                snapshot, outcome, reason = _parse_metadata_snapshot(payload, cache_key)
+                if snapshot is None:
+                    if outcome == "miss":
+                        attempts.append(
+                            MetadataCacheAttempt(
+                                cache_dir=cache_dir,
+                                cache_path=cache_path,
+                                outcome="miss",
+                                error_message=reason,
+                            )
+                        )
+                        continue
+                    saw_failure = True
                     attempts.append(
                         MetadataCacheAttempt(
                             cache_dir=cache_dir,
                             cache_path=cache_path,
-                            outcome="miss",
+                            outcome="invalid",
                             error_message=reason,
                         )
                     )
                     continue
-                saw_failure = True
-                attempts.append(
-                    MetadataCacheAttempt(
-                        cache_dir=cache_dir,
-                        cache_path=cache_path,
-                        outcome="invalid",
-                        error_message=reason,
-                    )
-                )
-                continue
+                if fingerprint is not None:
+                    self._last_loaded = ((cache_path, fingerprint, cache_key), snapshot)
 
             attempts.append(
                 MetadataCacheAttempt(
@@ -320,7 +881,7 @@ class DiskMetadataCache:
         self,
         cache_key: str,
         manifest_hash: str,
-        manifest: dict[tuple[str, str], tuple[int, int]],
+        manifest: Mapping[tuple[str, str], tuple[int, int]],
         sessions: list[SessionRecord],
     ) -> MetadataCachePersistResult:
         if not self.enabled:
@@ -330,7 +891,10 @@ class DiskMetadataCache:
                 cache_path=None,
             )
 
-        payload = {
+        # Version 2 snapshots are JSON lines: a header carrying the manifest,
+        # then one serialized session per line, so neither side ever holds the
+        # whole snapshot as a single Python object tree.
+        header = {
             "version": METADATA_CACHE_VERSION,
             "schema_version": METADATA_SCHEMA_VERSION,
             "updated_at": datetime.now(timezone.utc).isoformat(),
@@ -343,15 +907,21 @@ class DiskMetadataCache:
                     "mtime_ns": mtime_ns,
                     "size": size,
                 }
-                for (provider, source_path), (mtime_ns, size) in sorted(manifest.items())
+                for (provider, source_path), (mtime_ns, size) in sorted(
+                    manifest.items(), key=_MANIFEST_SORT_KEY
+                )
             ],
-            "sessions": [serialize_session_record(item) for item in sessions],
         }
+        # Kept as separate pieces and streamed to disk, so the snapshot is
+        # never joined into one large bytes object.
+        chunks = [_dumps_json(header), b"\n"]
+        for item in sessions:
+            chunks += (_dumps_json(serialize_session_record(item)), b"\n")
 
         attempts: list[MetadataCacheAttempt] = []
         for idx, cache_dir in enumerate(self._cache_dirs):
             cache_path = cache_dir / "metadata_snapshot.json"
-            ok, error = _atomic_write_json_with_error(cache_dir, cache_path, payload)
+            ok, error = _atomic_write_chunks_with_error(cache_dir, cache_path, chunks)
             if not ok:
                 attempts.append(
                     MetadataCacheAttempt(
@@ -390,169 +960,405 @@ class DiskMetadataCache:
             attempts=tuple(attempts),
         )
 
+    def persist_async(
+        self,
+        cache_key: str,
+        manifest_hash: str,
+        manifest: Mapping[tuple[str, str], tuple[int, int]],
+        sessions: list[SessionRecord],
+    ) -> Future[MetadataCachePersistResult]:
+        """
+        Run persist() on the shared background writer.
+
+        The manifest and session list are copied so callers may keep mutating
+        their own containers; load() waits for queued writes before reading.
+        """
+        return _submit_background_write(
+            self.persist, cache_key, manifest_hash, dict(manifest), list(sessions)
+        )
+
+
+def _parse_cached_datetime(value: Any) -> datetime | None:
+    # Cache payloads only ever hold isoformat() output, so try the direct parse
+    # before falling back to parse_timestamp's generic type dispatch.
+    if value is None:
+        return None
+    if type(value) is str:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return parse_timestamp(value)
+
 
 def serialize_session_record(record: SessionRecord) -> dict[str, Any]:
+    diagnostics = record.normalization_diagnostics
     return {
         "provider": record.provider,
         "session_id": record.session_id,
         "source_path": str(record.source_path),
-        "started_at": _serialize_datetime(record.started_at),
-        "updated_at": _serialize_datetime(record.updated_at),
+        "started_at": record.started_at,
+        "updated_at": record.updated_at,
         "working_dir": record.working_dir,
         "model": record.model,
-        "messages": [
-            {
-                "role": message.role,
-                "content": message.content,
-                "created_at": _serialize_datetime(message.created_at),
-            }
-            for message in record.messages
-        ],
-        "normalized_messages": [
-            {
-                "id": msg.id,
-                "role": msg.role,
-                "name": msg.name,
-                "timestamp": _serialize_datetime(msg.timestamp),
-                "latency_ms": msg.latency_ms,
-                "provider_meta": _json_friendly(msg.provider_meta),
-                "parts": [
-                    {
-                        "kind": part.kind,
-                        "text": part.text,
-                        "language": part.language,
-                        "tool_name": part.tool_name,
-                        "arguments": _json_friendly(part.arguments),
-                        "output": _json_friendly(part.output),
-                        "id": part.id,
-                    }
-                    for part in msg.parts
-                ],
-            }
-            for msg in (record.normalized_messages or [])
-        ],
+        "messages": _serialize_messages(record.messages),
+        "normalized_messages": _serialize_normalized_messages(record.normalized_messages or []),
         "normalization_diagnostics": (
             {
-                "total_events": record.normalization_diagnostics.total_events,
-                "parsed_events": record.normalization_diagnostics.parsed_events,
-                "skipped_events": record.normalization_diagnostics.skipped_events,
-                "warnings": list(record.normalization_diagnostics.warnings or []),
+                "total_events": diagnostics.total_events,
+                "parsed_events": diagnostics.parsed_events,
+                "skipped_events": diagnostics.skipped_events,
+                "warnings": list(diagnostics.warnings or []),
             }
-            if record.normalization_diagnostics
+            if diagnostics
             else None
         ),
     }
 
 
-def deserialize_session_record(payload: dict[str, Any]) -> SessionRecord:
-    messages = []
-    for entry in payload.get("messages") or []:
-        if not isinstance(entry, dict):
-            continue
-        messages.append(
-            Message(
-                role=str(entry.get("role") or "event"),
-                content=str(entry.get("content") or ""),
-                created_at=parse_timestamp(entry.get("created_at")),
-            )
-        )
+# Messages, normalized messages and their parts are all stored column-wise (one
+# list per field) rather than as one dict per item: field names are written
+# once per session instead of once per message, and the object count stays
+# flat for long sessions.
+
+
+def _serialize_messages(messages: list[Message]) -> dict[str, list[Any]]:
+    return {
+        "role": [message.role for message in messages],
+        "content": [message.content for message in messages],
+        "created_at": [message.created_at for message in messages],
+    }
+
+
+def _serialize_normalized_messages(messages: list[NormalizedMessage]) -> dict[str, list[Any]]:
+    return {
+        "id": [msg.id for msg in messages],
+        "role": [msg.role for msg in messages],
+        "name": [msg.name for msg in messages],
+        "timestamp": [msg.timestamp for msg in messages],
+        "latency_ms": [msg.latency_ms for msg in messages],
+        "provider_meta": [msg.provider_meta for msg in messages],
+        "parts": [_serialize_parts(msg.parts) for msg in messages],
+    }
 
-    normalized_messages: list[NormalizedMessage] = []
-    for entry in payload.get("normalized_messages") or []:
-        if not isinstance(entry, dict):
-            continue
-        parts: list[NormalizedPart] = []
-        for part_entry in entry.get("parts") or []:
-            if not isinstance(part_entry, dict):
-                continue
-            kind = str(part_entry.get("kind") or "text")
-            parts.append(
-                NormalizedPart(
-                    kind=kind,  # type: ignore[arg-type]
-                    text=part_entry.get("text"),
-                    language=part_entry.get("language"),
-                    tool_name=part_entry.get("tool_name"),
-                    arguments=part_entry.get("arguments"),
-                    output=part_entry.get("output"),
-                    id=part_entry.get("id"),
-                )
-            )
-        normalized_messages.append(
-            NormalizedMessage(
-                id=str(entry.get("id") or ""),
-                role=str(entry.get("role") or "assistant"),  # type: ignore[arg-type]
-                name=entry.get("name"),
-                timestamp=parse_timestamp(entry.get("timestamp")),
-                latency_ms=(
-                    float(latency_val)
-                    if isinstance((latency_val := entry.get("latency_ms")), int | float)
-                    else None
-                ),
-                provider_meta=entry.get("provider_meta"),
-                parts=parts,
-            )
-        )
 
-    diagnostics_payload = payload.get("normalization_diagnostics")
+def _serialize_parts(parts: list[NormalizedPart]) -> dict[str, list[Any]]:
+    return {
+        "kind": [part.kind for part in parts],
+        "text": [part.text for part in parts],
+        "language": [part.language for part in parts],
+        "tool_name": [part.tool_name for part in parts],
+        "arguments": [part.arguments for part in parts],
+        "output": [part.output for part in parts],
+        "id": [part.id for part in parts],
+    }
+
+
+def _column(columns: dict[str, Any], name: str, count: int) -> list[Any]:
+    values = columns.get(name)
+    return values if type(values) is list and len(values) == count else [None] * count
+
+
+def _deserialize_parts(
+    columns: Any,
+    _part: type[NormalizedPart] = NormalizedPart,
+) -> list[NormalizedPart]:
+    if type(columns) is not dict:
+        return []
+    kinds = columns.get("kind")
+    if type(kinds) is not list:
+        return []
+    count = len(kinds)
+    if not count:
+        return []
+    fields = [
+        _column(columns, name, count)
+        for name in ("text", "language", "tool_name", "arguments", "output", "id")
+    ]
+    fields[2] = intern_names(fields[2])
+    if not all(type(kind) is str and kind for kind in kinds):
+        kinds = [str(kind or "text") for kind in kinds]
+    kinds = intern_labels(kinds)
+    # map() over the columns constructs every part positionally without a
+    # Python-level loop.
+    return list(map(_part, kinds, *fields))
+
+
+def deserialize_session_record(payload: dict[str, Any]) -> SessionRecord:
+    get = payload.get
+    # A message and its normalized counterpart carry the same timestamp string,
+    # so parse each distinct value once per record and share the datetime.
+    timestamps: dict[str, datetime | None] = {}
+    diagnostics_payload = get("normalization_diagnostics")
     diagnostics: NormalizationDiagnostics | None = None
-    if isinstance(diagnostics_payload, dict):
+    if type(diagnostics_payload) is dict:
         diagnostics = NormalizationDiagnostics(
-            total_events=int(diagnostics_payload.get("total_events") or 0),
-            parsed_events=int(diagnostics_payload.get("parsed_events") or 0),
-            skipped_events=int(diagnostics_payload.get("skipped_events") or 0),
-            warnings=[
-                str(item)
-                for item in (diagnostics_payload.get("warnings") or [])
-                if item is not None
-            ],
+            int(diagnostics_payload.get("total_events") or 0),
+            int(diagnostics_payload.get("parsed_events") or 0),
+            int(diagnostics_payload.get("skipped_events") or 0),
+            [str(item) for item in (diagnostics_payload.get("warnings") or []) if item is not None],
         )
 
     return SessionRecord(
-        provider=str(payload.get("provider") or ""),
-        session_id=str(payload.get("session_id") or ""),
-        source_path=Path(str(payload.get("source_path") or "")),
-        started_at=parse_timestamp(payload.get("started_at")),
-        updated_at=parse_timestamp(payload.get("updated_at")),
-        working_dir=payload.get("working_dir"),
-        model=payload.get("model"),
-        messages=messages,
-        normalized_messages=normalized_messages,
+        provider=_as_str(get("provider"), ""),
+        session_id=_as_str(get("session_id"), ""),
+        source_path=Path(_as_str(get("source_path"), "")),
+        started_at=_parse_cached_datetime(get("started_at")),
+        updated_at=_parse_cached_datetime(get("updated_at")),
+        working_dir=get("working_dir"),
+        model=get("model"),
+        messages=_deserialize_messages(get("messages"), timestamps),
+        normalized_messages=_deserialize_normalized_messages(
+            get("normalized_messages"), timestamps
+        ),
         normalization_diagnostics=diagnostics,
     )
 
 
-def _serialize_datetime(value: datetime | None) -> str | None:
-    if not value:
-        return None
-    return value.isoformat()
+# The deserializers below run for every cached session, so they bind their
+# collaborators as default arguments, build dataclasses positionally from the
+# stored columns, and only coerce columns that are not already the expected type.
 
 
-def _json_friendly(value: Any) -> Any:
-    if value is None:
-        return None
-    try:
-        json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+def _as_str(value: Any, default: str) -> str:
+    if type(value) is str and value:
         return value
+    return str(value or default)
+
+
+def _deserialize_messages(
+    columns: Any,
+    timestamps: dict[str, datetime | None],
+    _message: type[Message] = Message,
+) -> list[Message]:
+    if type(columns) is not dict:
+        return []
+    roles = columns.get("role")
+    if type(roles) is not list or not roles:
+        return []
+    count = len(roles)
+    contents = _column(columns, "content", count)
+    if not all(type(role) is str and role for role in roles):
+        roles = [role if type(role) is str and role else str(role or "event") for role in roles]
+    roles = intern_labels(roles)
+    if not all(type(content) is str for content in contents):
+        contents = [content if type(content) is str else str(content or "") for content in contents]
+    created = _parse_timestamps(_column(columns, "created_at", count), timestamps)
+    return list(map(_message, roles, contents, created))
+
+
+def _deserialize_normalized_messages(
+    columns: Any,
+    timestamps: dict[str, datetime | None],
+    _message: type[NormalizedMessage] = NormalizedMessage,
+    _parts: Any = _deserialize_parts,
+) -> list[NormalizedMessage]:
+    if type(columns) is not dict:
+        return []
+    ids = columns.get("id")
+    if type(ids) is not list or not ids:
+        return []
+    count = len(ids)
+    roles = _column(columns, "role", count)
+    latencies = _column(columns, "latency_ms", count)
+    if not all(type(message_id) is str for message_id in ids):
+        ids = [
+            message_id if type(message_id) is str else str(message_id or "") for message_id in ids
+        ]
+    if not all(type(role) is str and role for role in roles):
+        roles = [role if type(role) is str and role else str(role or "assistant") for role in roles]
+    roles = intern_labels(roles)
+    if not all(latency is None or type(latency) is float for latency in latencies):
+        latencies = [
+            latency
+            if latency is None or type(latency) is float
+            else float(latency)
+            if isinstance(latency, int)
+            else None
+            for latency in latencies
+        ]
+    return list(
+        map(
+            _message,
+            ids,
+            roles,
+            map(_parts, _column(columns, "parts", count)),
+            _column(columns, "name", count),
+            _parse_timestamps(_column(columns, "timestamp", count), timestamps),
+            latencies,
+            _column(columns, "provider_meta", count),
+        )
+    )
+
+
+def _parse_timestamps(
+    values: list[Any],
+    timestamps: dict[str, datetime | None],
+    _parse: Any = _parse_cached_datetime,
+) -> list[datetime | None]:
+    parsed: list[datetime | None] = []
+    append = parsed.append
+    for value in values:
+        if type(value) is str:
+            if value not in timestamps:
+                timestamps[value] = _parse(value)
+            append(timestamps[value])
+        else:
+            append(None if value is None else _parse(value))
+    return parsed
+
+
+_BACKGROUND_WRITER: ThreadPoolExecutor | None = None
+_BACKGROUND_WRITER_LOCK = threading.Lock()
+
+
+def _background_writer_locked() -> ThreadPoolExecutor:
+    # One writer for every cache instance, so writes to the shared cache
+    # directory are applied in submission order.
+    global _BACKGROUND_WRITER
+    if _BACKGROUND_WRITER is None:
+        _BACKGROUND_WRITER = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="agent-sessions-cache"
+        )
+    return _BACKGROUND_WRITER
+
+
+_PENDING_WRITES: set[Future[Any]] = set()
+
+
+def _submit_background_write(fn: Callable[..., _T], *args: Any) -> Future[_T]:
+    with _BACKGROUND_WRITER_LOCK:
+        future = _background_writer_locked().submit(fn, *args)
+        _PENDING_WRITES.add(future)
+    future.add_done_callback(_discard_pending_write)
+    return future
+
+
+def _discard_pending_write(future: Future[Any]) -> None:
+    with _BACKGROUND_WRITER_LOCK:
+        _PENDING_WRITES.discard(future)
+
+
+def wait_for_background_writes(timeout: float | None = None) -> None:
+    """Block until cache writes queued so far in this process have finished."""
+    with _BACKGROUND_WRITER_LOCK:
+        pending = list(_PENDING_WRITES)
+    futures_wait(pending, timeout=timeout)
+
+
+def _shard_name(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _compress_shard(data: bytes) -> bytes:
+    compressor = zlib.compressobj(SESSION_SHARD_COMPRESSION_LEVEL, zdict=_SHARD_ZDICT)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decompress_shard(data: bytes) -> bytes:
+    decompressor = zlib.decompressobj(zdict=_SHARD_ZDICT)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+_ISO = datetime.isoformat
+
+
+def _json_default(value: Any) -> Any:
+    # Encoders only call this for values they cannot represent, so arbitrary
+    # provider payloads (arguments, outputs, provider_meta) cost nothing extra
+    # when they are plain JSON and degrade to str() when they are not.
+    if type(value) is datetime or isinstance(value, datetime):
+        return _ISO(value)
+    return str(value)
+
+
+# json.dumps() builds a fresh encoder whenever non-default options are passed;
+# reuse one. Keep ensure_ascii so undecodable path surrogates round-trip as escapes.
+_FALLBACK_ENCODER = json.JSONEncoder(separators=(",", ":"), default=_json_default)
+
+
+def _dumps_json(payload: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson is stricter than json in a few corners; fall through.
+            pass
+    try:
+        return _FALLBACK_ENCODER.encode(payload).encode("utf-8")
     except TypeError:
-        return str(value)
+        # Keys that neither encoder accepts (tuples, objects) only show up in
+        # provider payloads; stringify them rather than dropping the session.
+        return _FALLBACK_ENCODER.encode(_stringify_keys(payload)).encode("utf-8")
+
+
+def _stringify_keys(value: Any) -> Any:
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if not (key is None or isinstance(key, str | int | float | bool)):
+                key = str(key)
+            result[key] = _stringify_keys(item)
+        return result
+    if isinstance(value, list | tuple):
+        return [_stringify_keys(item) for item in value]
+    return value
+
+
+def _loads_json(raw: bytes | memoryview) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(bytes(raw) if type(raw) is memoryview else raw)
 
 
 def _load_json_payload(path: Path) -> Any:
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
+        return _loads_json(path.read_bytes())
+    except (OSError, ValueError):
         return None
 
 
-def _load_json_payload_with_error(path: Path) -> tuple[Any, Exception | None]:
+def _load_metadata_payload_with_error(path: Path) -> tuple[Any, Exception | None]:
     try:
-        raw = path.read_text(encoding="utf-8")
+        raw = path.read_bytes()
     except OSError as exc:
         return None, exc
+    # Version 1 snapshots are a single compact JSON document (one line), so the
+    # first line is either the whole v1 payload or the v2 header.
+    newline = raw.find(b"\n")
+    if newline < 0:
+        newline = len(raw)
     try:
-        return json.loads(raw), None
-    except json.JSONDecodeError as exc:
+        payload = _loads_json(memoryview(raw)[:newline])
+    except ValueError as exc:
         return None, exc
+    if isinstance(payload, dict) and payload.get("version") == METADATA_CACHE_VERSION:
+        payload["sessions"] = _iter_session_lines(raw, newline + 1)
+    return payload, None
+
+
+def _iter_session_lines(raw: bytes, start: int = 0) -> Iterator[Any]:
+    # Lines are decoded from memoryview slices of the file contents, so the
+    # snapshot is never copied again into a body and per-line bytes objects.
+    decode_typed = cache_structs.decode_session_record if cache_structs is not None else None
+    view = memoryview(raw)
+    end = len(raw)
+    while start < end:
+        stop = raw.find(b"\n", start)
+        if stop < 0:
+            stop = end
+        line = view[start:stop]
+        start = stop + 1
+        if not line:
+            continue
+        if decode_typed is not None:
+            try:
+                yield decode_typed(line)
+                continue
+            except ValueError:
+                # Off-schema line (or not JSON at all); let the generic path decide.
+                pass
+        yield _loads_json(line)
 
 
 def _parse_metadata_snapshot(
@@ -563,7 +1369,7 @@ def _parse_metadata_snapshot(
         return None, "invalid", "payload_not_dict"
 
     version = payload.get("version")
-    if version != METADATA_CACHE_VERSION:
+    if version not in _METADATA_READABLE_VERSIONS:
         return None, "miss", "version_mismatch"
 
     schema_version = payload.get("schema_version")
@@ -577,28 +1383,34 @@ def _parse_metadata_snapshot(
     raw_manifest = payload.get("manifest")
     if not isinstance(raw_manifest, list):
         return None, "invalid", "manifest_invalid"
-    manifest: dict[tuple[str, str], tuple[int, int]] = {}
+    manifest = SnapshotManifest()
+    append = manifest.append
     for entry in raw_manifest:
-        if not isinstance(entry, dict):
+        try:
+            provider = entry["provider"]
+            source_path = entry["source_path"]
+            mtime_ns = entry["mtime_ns"]
+            size = entry["size"]
+        except (KeyError, TypeError):
             continue
-        provider = entry.get("provider")
-        source_path = entry.get("source_path")
-        mtime_ns = entry.get("mtime_ns")
-        size = entry.get("size")
-        if (
-            isinstance(provider, str)
-            and isinstance(source_path, str)
-            and isinstance(mtime_ns, int)
-            and isinstance(size, int)
-        ):
-            manifest[(provider, source_path)] = (mtime_ns, size)
+        # Exact type checks: cheaper than isinstance and they reject bools.
+        if type(provider) is str is type(source_path) and type(mtime_ns) is int is type(size):
+            try:
+                append(provider, source_path, mtime_ns, size)
+            except OverflowError:
+                continue
 
     raw_sessions = payload.get("sessions")
-    if not isinstance(raw_sessions, list):
+    if not isinstance(raw_sessions, list | Iterator):
+        return None, "invalid", "sessions_invalid"
+    try:
+        sessions = [
+            entry if isinstance(entry, SessionRecord) else deserialize_session_record(entry)
+            for entry in raw_sessions
+            if isinstance(entry, SessionRecord | dict)
+        ]
+    except ValueError:
         return None, "invalid", "sessions_invalid"
-    sessions = [
-        deserialize_session_record(entry) for entry in raw_sessions if isinstance(entry, dict)
-    ]
 
     manifest_hash = payload.get("manifest_hash")
     if not isinstance(manifest_hash, str):
@@ -616,27 +1428,45 @@ def _parse_metadata_snapshot(
     )
 
 
-def _atomic_write_json(cache_dir: Path, cache_path: Path, payload: dict[str, Any]) -> bool:
-    try:
-        cache_dir.mkdir(parents=True, exist_ok=True)
-        tmp_path = cache_path.with_suffix(".tmp")
-        tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
-        tmp_path.replace(cache_path)
-    except OSError:
-        return False
-    return True
+def _atomic_write_bytes(cache_dir: Path, cache_path: Path, data: bytes) -> bool:
+    ok, _error = _atomic_write_bytes_with_error(cache_dir, cache_path, data)
+    return ok
 
 
-def _atomic_write_json_with_error(
+def _atomic_write_bytes_with_error(
     cache_dir: Path,
     cache_path: Path,
-    payload: dict[str, Any],
+    data: bytes,
 ) -> tuple[bool, Exception | None]:
+    return _atomic_write_chunks_with_error(cache_dir, cache_path, (data,))
+
+
+def _atomic_write_chunks_with_error(
+    cache_dir: Path,
+    cache_path: Path,
+    chunks: Iterable[bytes],
+) -> tuple[bool, Exception | None]:
+    # Writing the pieces in order through one buffered handle avoids joining
+    # a large payload into a single bytes object first.
+    target = os.fspath(cache_path)
+    tmp_path = target + ".tmp"
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
     try:
-        cache_dir.mkdir(parents=True, exist_ok=True)
-        tmp_path = cache_path.with_suffix(".tmp")
-        tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
-        tmp_path.replace(cache_path)
+        try:
+            fd = os.open(tmp_path, flags, 0o644)
+        except FileNotFoundError:
+            # Only create the directory when it is missing, rather than paying
+            # for a mkdir (and the stat behind exist_ok) on every write.
+            os.makedirs(cache_dir, exist_ok=True)
+            fd = os.open(tmp_path, flags, 0o644)
+        with open(fd, "wb") as handle:
+            handle.writelines(chunks)
+            handle.flush()
+            # The cache is rebuildable, so durability is opt-in; the rename below
+            # is atomic either way.
+            if cache_fsync_enabled():
+                os.fsync(fd)
+        os.replace(tmp_path, target)
     except OSError as exc:
         return False, exc
     return True, None
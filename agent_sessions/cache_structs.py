@@ -0,0 +1,161 @@
+"""Typed msgspec schemas for decoding cached session payloads (optional speedup)."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import msgspec
+
+from .model import (
+    Message,
+    NormalizationDiagnostics,
+    NormalizedMessage,
+    NormalizedPart,
+    SessionRecord,
+)
+from .util import intern_labels, intern_names
+
+
+class CachedMessages(msgspec.Struct):
+    role: list[str] = []
+    content: list[str] = []
+    created_at: list[datetime | None] = []
+
+
+class CachedParts(msgspec.Struct):
+    kind: list[str] = []
+    text: list[str | None] = []
+    language: list[str | None] = []
+    tool_name: list[str | None] = []
+    arguments: list[Any] = []
+    output: list[Any] = []
+    id: list[str | None] = []
+
+
+class CachedNormalizedMessages(msgspec.Struct):
+    id: list[str] = []
+    role: list[str] = []
+    name: list[str | None] = []
+    timestamp: list[datetime | None] = []
+    latency_ms: list[float | None] = []
+    provider_meta: list[Any] = []
+    parts: list[CachedParts | None] = []
+
+
+class CachedDiagnostics(msgspec.Struct):
+    total_events: int = 0
+    parsed_events: int = 0
+    skipped_events: int = 0
+    warnings: list[str] = []
+
+
+class CachedSession(msgspec.Struct):
+    provider: str = ""
+    session_id: str = ""
+    source_path: str = ""
+    started_at: datetime | None = None
+    updated_at: datetime | None = None
+    working_dir: str | None = None
+    model: str | None = None
+    messages: CachedMessages | None = None
+    normalized_messages: CachedNormalizedMessages | None = None
+    normalization_diagnostics: CachedDiagnostics | None = None
+
+
+_SESSION_DECODER = msgspec.json.Decoder(CachedSession)
+
+
+def decode_session_record(raw: bytes | memoryview) -> SessionRecord:
+    """
+    Decode one serialized session straight into a ``SessionRecord``.
+
+    Raises ``ValueError`` (``msgspec.DecodeError``) when the payload does not
+    match the schema; callers fall back to the untyped decoder in that case.
+    """
+    cached = _SESSION_DECODER.decode(raw)
+    diagnostics = cached.normalization_diagnostics
+    return SessionRecord(
+        provider=cached.provider,
+        session_id=cached.session_id,
+        source_path=Path(cached.source_path),
+        started_at=cached.started_at,
+        updated_at=cached.updated_at,
+        working_dir=cached.working_dir,
+        model=cached.model,
+        messages=_messages(cached.messages),
+        normalized_messages=_normalized_messages(cached.normalized_messages),
+        normalization_diagnostics=(
+            NormalizationDiagnostics(
+                diagnostics.total_events,
+                diagnostics.parsed_events,
+                diagnostics.skipped_events,
+                diagnostics.warnings,
+            )
+            if diagnostics is not None
+            else None
+        ),
+    )
+
+
+def _messages(columns: CachedMessages | None) -> list[Message]:
+    if columns is None or not columns.role:
+        return []
+    _require_length(len(columns.role), columns.content, columns.created_at)
+    roles = intern_labels([role or "event" for role in columns.role])
+    return list(map(Message, roles, columns.content, columns.created_at))
+
+
+def _normalized_messages(columns: CachedNormalizedMessages | None) -> list[NormalizedMessage]:
+    if columns is None or not columns.id:
+        return []
+    _require_length(
+        len(columns.id),
+        columns.role,
+        columns.parts,
+        columns.name,
+        columns.timestamp,
+        columns.latency_ms,
+        columns.provider_meta,
+    )
+    roles = intern_labels([role or "assistant" for role in columns.role])
+    return list(
+        map(
+            NormalizedMessage,
+            columns.id,
+            roles,
+            map(_parts, columns.parts),
+            columns.name,
+            columns.timestamp,
+            columns.latency_ms,
+            columns.provider_meta,
+        )
+    )
+
+
+def _require_length(count: int, *columns: list[Any]) -> None:
+    # Ragged columns are tolerated by the untyped decoder (missing values
+    # become None), so hand such payloads back to it.
+    if any(len(column) != count for column in columns):
+        raise ValueError("cached columns have mismatched lengths")
+
+
+def _parts(columns: CachedParts | None) -> list[NormalizedPart]:
+    if columns is None or not columns.kind:
+        return []
+    count = len(columns.kind)
+    fields = [
+        values if len(values) == count else [None] * count
+        for values in (
+            columns.text,
+            columns.language,
+            columns.tool_name,
+            columns.arguments,
+            columns.output,
+            columns.id,
+        )
+    ]
+    fields[2] = intern_names(fields[2])
+    kinds = intern_labels([kind or "text" for kind in columns.kind])
+    return list(map(NormalizedPart, kinds, *fields))
@@ -4,10 +4,12 @@ from __future__ import annotations
 
 import hashlib
 import json
+import operator
 import os
 import threading
 import time
-from collections.abc import Sequence
+from collections.abc import Collection, Mapping, Sequence
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -16,7 +18,8 @@ from .cache import (
     DiskMetadataCache,
     DiskSessionCache,
     MetadataCacheAttempt,
-    path_fingerprint,
+    MetadataCachePersistResult,
+    batch_fingerprints,
 )
 from .indexer import build_providers, load_sessions
 from .model import SessionRecord
@@ -25,11 +28,21 @@ from .providers.logging import debug_warning
 from .query import SessionPage, SessionQuery, apply_filters, sort_sessions
 from .telemetry import log_event
 
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional speedup
+    xxhash = None  # type: ignore[assignment]
+
 _TRUE_VALUES = {"1", "true", "yes", "on"}
+_MANIFEST_SORT_KEY = operator.itemgetter(0)
 
 
-def _strict_cache_mode() -> bool:
-    return os.getenv("AGENT_SESSIONS_STRICT_CACHE", "").strip().lower() in _TRUE_VALUES
+def _force_blocking_refresh() -> bool:
+    # AGENT_SESSIONS_STRICT_CACHE is the older name for the same switch.
+    return any(
+        os.getenv(name, "").strip().lower() in _TRUE_VALUES
+        for name in ("AGENT_SESSIONS_FORCE_BLOCKING_REFRESH", "AGENT_SESSIONS_STRICT_CACHE")
+    )
 
 
 @dataclass
@@ -80,39 +93,54 @@ class SessionService:
         self._providers: list[SessionProvider] | None = (
             list(providers) if providers is not None else None
         )
+        self._providers_by_name: dict[str, SessionProvider] | None = None
         self._clock = clock or time.time
         self._lock = threading.Lock()
-        self._refresh_condition = threading.Condition(self._lock)
         self._provider_io_lock = threading.Lock()
 
-        self._sessions: list[SessionRecord] = []
+        # Replaced wholesale, never mutated, so readers can share it unlocked.
+        self._sessions: tuple[SessionRecord, ...] = ()
         self._sessions_by_path: dict[str, SessionRecord] = {}
         self._sessions_by_provider_id: dict[tuple[str, str], SessionRecord] = {}
-        self._manifest: dict[tuple[str, str], tuple[int, int]] = {}
+        # Index into _sessions of the record held in _sessions_by_provider_id.
+        self._session_positions: dict[tuple[str, str], int] = {}
+        # Sorted views of _sessions, built on first use per order and dropped
+        # whenever _sessions changes.
+        self._sorted_by_order: dict[str, list[SessionRecord]] = {}
+        self._manifest: Mapping[tuple[str, str], tuple[int, int]] = {}
         self._manifest_hash: str = ""
         self._cache_key: str | None = None
+        self._cache_key_memo: tuple[tuple[_ProviderIdentity, ...], str] | None = None
 
         self._cache_state = _CacheState(refresh_interval=refresh_interval)
-        self._serve_stale_while_revalidate = (
-            self._provider_overrides is None and not _strict_cache_mode()
+        # Once a snapshot exists, refreshes run in the background and readers
+        # keep getting the current snapshot. Only an empty snapshot, an explicit
+        # zero refresh interval (reload on every request) or the opt-in env
+        # switch make a request wait for a rescan.
+        self._serve_stale_while_revalidate = not _force_blocking_refresh() and not (
+            refresh_interval is not None and refresh_interval <= 0
         )
         self._bootstrapped_from_disk = False
         self._startup_validation_scheduled = False
 
-        self._refresh_inflight = False
+        self._refresh_future: Future[None] | None = None
         self._direct_inflight: dict[str, _InFlightDirectLoad] = {}
 
         self._metadata_cache = DiskMetadataCache.from_env()
-        self._direct_disk_cache = DiskSessionCache.from_env()
-        self._direct_disk_cache_loaded = False
+        self._session_cache = DiskSessionCache.from_env()
+        self._session_cache_loaded = False
+        self._session_cache_lock = threading.Lock()
 
     def list_sessions(
         self, query: SessionQuery, *, max_page_size: int | None = None
     ) -> SessionPage:
         normalized = query.normalized(max_page_size=max_page_size)
-        sessions = self._all_sessions()
-        filtered = apply_filters(sessions, normalized)
-        ordered = sort_sessions(filtered, normalized.order)
+        # Filtering keeps order, so filtering the presorted snapshot gives the
+        # same result as sorting the filtered sessions on every request. An
+        # unfiltered query pages straight over the presorted snapshot.
+        ordered = self._sorted_sessions(normalized.order)
+        if not normalized.is_empty_filter:
+            ordered = apply_filters(ordered, normalized)
 
         total = len(ordered)
         if total == 0:
@@ -142,7 +170,7 @@ class SessionService:
             has_previous=page > 1,
         )
 
-    def all_sessions(self) -> list[SessionRecord]:
+    def all_sessions(self) -> Sequence[SessionRecord]:
         return self._all_sessions()
 
     def get_session(
@@ -184,17 +212,28 @@ class SessionService:
 
     # Internal helpers -------------------------------------------------
 
-    def _all_sessions(self) -> list[SessionRecord]:
+    def _all_sessions(self) -> tuple[SessionRecord, ...]:
+        self._ensure_snapshot_ready()
+        return self._sessions
+
+    def _sorted_sessions(self, order: str) -> list[SessionRecord]:
         self._ensure_snapshot_ready()
         with self._lock:
-            return list(self._sessions)
+            ordered = self._sorted_by_order.get(order)
+            if ordered is None:
+                ordered = sort_sessions(self._sessions, order)
+                self._sorted_by_order[order] = ordered
+            return ordered
 
     def _ensure_snapshot_ready(self) -> None:
         blocking_reason: str | None = None
         background_reason: str | None = None
+        warm_session_cache = False
 
         with self._lock:
             if not self._sessions:
+                if not self._bootstrapped_from_disk:
+                    warm_session_cache = self._session_cache.enabled
                 self._bootstrap_from_disk_cache_locked()
                 if not self._sessions:
                     blocking_reason = "startup_miss"
@@ -212,6 +251,8 @@ class SessionService:
                 else:
                     blocking_reason = "refresh_interval"
 
+        if warm_session_cache:
+            self._warm_session_cache_async()
         if blocking_reason:
             self._refresh_blocking(blocking_reason)
         elif background_reason:
@@ -254,28 +295,45 @@ class SessionService:
 
     def _refresh_async(self, reason: str) -> None:
         with self._lock:
-            if self._refresh_inflight:
+            if self._refresh_future is not None:
                 return
-            self._refresh_inflight = True
-        thread = threading.Thread(target=self._refresh_worker, args=(reason,), daemon=True)
+            future = self._refresh_future = Future()
+        thread = threading.Thread(target=self._refresh_worker, args=(reason, future), daemon=True)
         thread.start()
 
     def _refresh_blocking(self, reason: str) -> None:
         with self._lock:
-            if self._refresh_inflight:
-                while self._refresh_inflight:
-                    self._refresh_condition.wait()
-                return
-            self._refresh_inflight = True
-        self._refresh_worker(reason)
+            future = self._refresh_future
+            if future is None:
+                future = self._refresh_future = Future()
+                owner = True
+            else:
+                owner = False
+        if owner:
+            self._refresh_worker(reason, future)
+        else:
+            # Only the caller that started the refresh raises its error; waiters
+            # log it and go on with the snapshot that is already loaded.
+            try:
+                future.result()
+            except Exception as exc:
+                debug_warning(f"Shared refresh ({reason}) failed", exc)
+                log_event("refresh.shared", status="error", reason=reason, error=str(exc))
 
-    def _refresh_worker(self, reason: str) -> None:
+    def _refresh_worker(self, reason: str, future: Future[None]) -> None:
         try:
             self._refresh_snapshot(reason)
-        finally:
-            with self._lock:
-                self._refresh_inflight = False
-                self._refresh_condition.notify_all()
+        except BaseException as exc:
+            self._finish_refresh(future)
+            future.set_exception(exc)
+            raise
+        self._finish_refresh(future)
+        future.set_result(None)
+
+    def _finish_refresh(self, future: Future[None]) -> None:
+        with self._lock:
+            if self._refresh_future is future:
+                self._refresh_future = None
 
     def _refresh_snapshot(self, reason: str) -> None:
         providers = self._providers_for_refresh()
@@ -283,7 +341,7 @@ class SessionService:
 
         manifest_started = time.perf_counter()
         with self._provider_io_lock:
-            manifest = self._build_manifest(providers)
+            manifest, live_sources = self._build_manifest(providers)
         manifest_ms = (time.perf_counter() - manifest_started) * 1000
         manifest_hash = self._manifest_hash_for(manifest)
 
@@ -318,7 +376,7 @@ class SessionService:
             return
 
         rebuild_started = time.perf_counter()
-        sessions = self._load_sessions_with_cache(providers)
+        sessions = self._load_sessions_with_cache(providers, live_sources)
         rebuild_ms = (time.perf_counter() - rebuild_started) * 1000
 
         with self._lock:
@@ -329,35 +387,45 @@ class SessionService:
                 cache_key=cache_key,
             )
 
+        status = "miss" if not has_sessions else "stale"
         write_started = time.perf_counter()
-        persist_result = self._metadata_cache.persist(cache_key, manifest_hash, manifest, sessions)
-        cache_write_ms = (time.perf_counter() - write_started) * 1000
 
-        status = "miss" if not has_sessions else "stale"
-        log_event(
-            "startup.cache_decision",
-            status=status,
-            reason=reason,
-            rebuild_ms=rebuild_ms,
-            manifest_ms=manifest_ms,
-            cache_write_ms=cache_write_ms,
-            metadata_cache_status=persist_result.status,
-            metadata_cache_path=(
-                str(persist_result.cache_path) if persist_result.cache_path else None
-            ),
-            metadata_cache_attempts=len(persist_result.attempts),
-            metadata_cache_failures=_metadata_cache_failures(persist_result.attempts),
-            sessions=len(sessions),
-        )
+        # The snapshot write is best-effort, so it runs on the cache writer thread
+        # and the decision is logged once its outcome is known.
+        def log_decision(future: Future[MetadataCachePersistResult]) -> None:
+            persist_result = future.result()
+            log_event(
+                "startup.cache_decision",
+                status=status,
+                reason=reason,
+                rebuild_ms=rebuild_ms,
+                manifest_ms=manifest_ms,
+                cache_write_ms=(time.perf_counter() - write_started) * 1000,
+                metadata_cache_status=persist_result.status,
+                metadata_cache_path=(
+                    str(persist_result.cache_path) if persist_result.cache_path else None
+                ),
+                metadata_cache_attempts=len(persist_result.attempts),
+                metadata_cache_failures=_metadata_cache_failures(persist_result.attempts),
+                sessions=len(sessions),
+            )
+
+        self._metadata_cache.persist_async(
+            cache_key, manifest_hash, manifest, sessions
+        ).add_done_callback(log_decision)
 
     def _load_sessions_with_cache(
         self,
         providers: Sequence[SessionProvider],
+        live_sources: Mapping[str, Collection[str]],
     ) -> list[SessionRecord]:
-        disk_cache = DiskSessionCache.from_env()
+        # One long-lived cache serves refreshes and direct loads alike, so
+        # decoded records carry over between refreshes; its index is re-read
+        # only when another process has changed it.
+        disk_cache = self._session_cache
 
         cache_read_started = time.perf_counter()
-        disk_cache.load()
+        self._ensure_session_cache_loaded()
         cache_read_ms = (time.perf_counter() - cache_read_started) * 1000
 
         for provider in providers:
@@ -366,9 +434,14 @@ class SessionService:
         index_started = time.perf_counter()
         sessions = load_sessions(providers)
         index_ms = (time.perf_counter() - index_started) * 1000
+        # Forget sources that vanished, so the long-lived maps do not grow
+        # with every deleted or renamed transcript.
+        disk_cache.retain(live_sources)
 
+        # Shard writes happen on the cache's background writer; this only
+        # measures handing them off.
         cache_write_started = time.perf_counter()
-        disk_cache.persist()
+        disk_cache.persist_async()
         cache_write_ms = (time.perf_counter() - cache_write_started) * 1000
 
         log_event(
@@ -414,6 +487,7 @@ class SessionService:
             if record is not None:
                 with self._lock:
                     self._upsert_session_locked(record)
+                self._session_cache.persist_async()
             return SessionLoadResult(
                 session=record,
                 source="direct",
@@ -433,7 +507,8 @@ class SessionService:
     ) -> SessionRecord | None:
         providers = self._providers_for_lookup()
         if provider:
-            candidate = next((item for item in providers if item.name == provider), None)
+            with self._lock:
+                candidate = self._provider_named_locked(provider)
             if candidate is None:
                 return None
             return self._try_direct_load(candidate, source_path, session_id)
@@ -498,11 +573,19 @@ class SessionService:
             self._providers = build_providers()
         return self._providers
 
+    def _provider_named_locked(self, name: str) -> SessionProvider | None:
+        if self._providers_by_name is None:
+            by_name: dict[str, SessionProvider] = {}
+            for provider in self._providers_locked():
+                by_name.setdefault(provider.name, provider)
+            self._providers_by_name = by_name
+        return self._providers_by_name.get(name)
+
     def _providers_for_lookup(self) -> list[SessionProvider]:
         with self._lock:
             providers = list(self._providers_locked())
-            self._ensure_direct_disk_cache_loaded_locked()
-            cache = self._direct_disk_cache
+        self._ensure_session_cache_loaded()
+        cache = self._session_cache
         for provider in providers:
             provider.attach_cache(cache)
         return providers
@@ -514,110 +597,187 @@ class SessionService:
             return build_providers()
         return self._providers_for_lookup()
 
-    def _ensure_direct_disk_cache_loaded_locked(self) -> None:
-        if self._direct_disk_cache_loaded:
+    def _ensure_session_cache_loaded(self) -> None:
+        # Loaded under its own lock so a slow index read never holds up
+        # snapshot queries waiting on _lock. Once loaded, only a changed index
+        # (e.g. a CLI run next to the server) is read again.
+        if self._session_cache_loaded:
+            self._session_cache.refresh()
             return
-        started = time.perf_counter()
-        self._direct_disk_cache.load()
-        self._direct_disk_cache_loaded = True
-        log_event(
-            "session.direct_cache_read",
-            cache_read_ms=(time.perf_counter() - started) * 1000,
-        )
+        with self._session_cache_lock:
+            if self._session_cache_loaded:
+                return
+            started = time.perf_counter()
+            self._session_cache.load()
+            self._session_cache_loaded = True
+            log_event(
+                "session.direct_cache_read",
+                cache_read_ms=(time.perf_counter() - started) * 1000,
+            )
+
+    def _warm_session_cache_async(self) -> None:
+        # Read the session cache index while the first page is being looked at,
+        # so opening a session or the next refresh does not pay for it.
+        thread = threading.Thread(target=self._ensure_session_cache_loaded, daemon=True)
+        thread.start()
 
     def _build_manifest(
         self, providers: Sequence[SessionProvider]
-    ) -> dict[tuple[str, str], tuple[int, int]]:
-        manifest: dict[tuple[str, str], tuple[int, int]] = {}
+    ) -> tuple[dict[tuple[str, str], tuple[int, int]], dict[str, set[str]]]:
+        """
+        Fingerprint every cache validation path.
+
+        Also returns, per provider that enumerated successfully, the paths as
+        the provider reported them, which is how the session cache keys them.
+        """
+        candidates: list[tuple[str, str]] = []
+        live_sources: dict[str, set[str]] = {}
         for provider in providers:
             try:
-                paths = provider.cache_validation_paths()
+                paths = list(provider.cache_validation_paths())
             except Exception as exc:
                 debug_warning(f"Provider {provider.name} failed to enumerate cache paths", exc)
                 continue
+            reported = live_sources.setdefault(provider.name, set())
             for path in paths:
+                reported.add(str(path))
                 canonical = _canonical_path(path)
-                if canonical is None:
-                    continue
-                fingerprint = path_fingerprint(canonical)
-                if fingerprint is None:
-                    continue
-                manifest[(provider.name, str(canonical))] = fingerprint
-        return manifest
+                if canonical is not None:
+                    candidates.append((provider.name, canonical))
 
-    @staticmethod
-    def _manifest_hash_for(manifest: dict[tuple[str, str], tuple[int, int]]) -> str:
-        hasher = hashlib.sha256()
-        for (provider, source_path), (mtime_ns, size) in sorted(manifest.items()):
-            hasher.update(
-                f"{provider}\0{source_path}\0{mtime_ns}\0{size}\n".encode("utf-8", "ignore")
-            )
-        return hasher.hexdigest()
+        fingerprints = batch_fingerprints(path for _name, path in candidates)
+        manifest: dict[tuple[str, str], tuple[int, int]] = {}
+        for name, source_path in candidates:
+            fingerprint = fingerprints.get(source_path)
+            if fingerprint is not None:
+                manifest[(name, source_path)] = fingerprint
+        return manifest, live_sources
 
     @staticmethod
-    def _compute_cache_key(providers: Sequence[SessionProvider]) -> str:
+    def _manifest_hash_for(manifest: Mapping[tuple[str, str], tuple[int, int]]) -> str:
+        # Keys are unique, so sorting on them alone orders the same way as the
+        # full items; joining the lines and encoding once hashes the same bytes
+        # as feeding them line by line, without a bytes object and update() per entry.
+        lines = [
+            f"{provider}\0{source_path}\0{mtime_ns}\0{size}\n"
+            for (provider, source_path), (mtime_ns, size) in sorted(
+                manifest.items(), key=_MANIFEST_SORT_KEY
+            )
+        ]
+        return _identity_digest("".join(lines).encode("utf-8", "ignore"))
+
+    def _compute_cache_key(self, providers: Sequence[SessionProvider]) -> str:
+        # Refreshes rebuild providers, so memoize on what the key is derived
+        # from rather than on the provider objects themselves.
+        identity = tuple(_provider_identity(provider) for provider in providers)
+        memo = self._cache_key_memo
+        if memo is not None and memo[0] == identity:
+            return memo[1]
         payload = {
             "schema_version": METADATA_SCHEMA_VERSION,
             "providers": [
                 {
-                    "name": provider.name,
-                    "module": provider.__class__.__module__,
-                    "class": provider.__class__.__qualname__,
-                    "base_dir": str(provider.base_dir.expanduser()),
-                    "glob_patterns": list(getattr(provider, "glob_patterns", ())),
-                    "env_var": provider.env_var,
-                    "env_value": os.getenv(provider.env_var, "") if provider.env_var else "",
+                    "name": name,
+                    "module": module,
+                    "class": qualname,
+                    "base_dir": base_dir,
+                    "glob_patterns": list(glob_patterns),
+                    "env_var": env_var,
+                    "env_value": env_value,
                 }
-                for provider in sorted(providers, key=lambda item: item.name)
+                for (
+                    name,
+                    module,
+                    qualname,
+                    base_dir,
+                    glob_patterns,
+                    env_var,
+                    env_value,
+                ) in sorted(identity, key=_PROVIDER_NAME_KEY)
             ],
         }
         raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-        return hashlib.sha256(raw).hexdigest()
+        cache_key = _identity_digest(raw)
+        self._cache_key_memo = (identity, cache_key)
+        return cache_key
 
     def _apply_snapshot_locked(
         self,
         *,
         sessions: list[SessionRecord],
-        manifest: dict[tuple[str, str], tuple[int, int]],
+        manifest: Mapping[tuple[str, str], tuple[int, int]],
         manifest_hash: str,
         cache_key: str,
     ) -> None:
-        self._sessions = list(sessions)
-        self._manifest = dict(manifest)
+        # Manifests are never mutated after they are built or loaded, so keep
+        # the snapshot's compact mapping instead of copying it into a dict.
+        self._sessions = tuple(sessions)
+        self._sorted_by_order = {}
+        self._manifest = manifest
         self._manifest_hash = manifest_hash
         self._cache_key = cache_key
         self._cache_state.mark_loaded(self._clock())
 
         by_path: dict[str, SessionRecord] = {}
         by_provider_id: dict[tuple[str, str], SessionRecord] = {}
-        for record in self._sessions:
+        positions: dict[tuple[str, str], int] = {}
+        for position, record in enumerate(self._sessions):
+            provider_key = (record.provider, record.session_id)
             by_path[str(record.source_path)] = record
-            by_provider_id[(record.provider, record.session_id)] = record
+            by_provider_id[provider_key] = record
+            positions[provider_key] = position
         self._sessions_by_path = by_path
         self._sessions_by_provider_id = by_provider_id
+        self._session_positions = positions
 
     def _upsert_session_locked(self, record: SessionRecord) -> None:
         source_key = str(record.source_path)
         provider_key = (record.provider, record.session_id)
-        existing = self._sessions_by_provider_id.get(provider_key)
+        position = self._session_positions.get(provider_key)
 
-        if existing is None:
-            self._sessions.append(record)
+        # Direct loads are rare next to reads, so copy on write.
+        if position is None:
+            self._session_positions[provider_key] = len(self._sessions)
+            self._sessions = (*self._sessions, record)
         else:
-            try:
-                index = self._sessions.index(existing)
-            except ValueError:
-                self._sessions.append(record)
-            else:
-                self._sessions[index] = record
+            sessions = self._sessions
+            self._sessions = (*sessions[:position], record, *sessions[position + 1 :])
 
         self._sessions_by_provider_id[provider_key] = record
         self._sessions_by_path[source_key] = record
+        self._sorted_by_order = {}
+
+
+def _identity_digest(data: bytes) -> str:
+    # These digests only detect changes; nothing relies on them being
+    # cryptographic, so use xxh3 (an order of magnitude faster) when available.
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.sha256(data).hexdigest()
+
+
+_ProviderIdentity = tuple[str, str, str, str, tuple[str, ...], str | None, str]
+_PROVIDER_NAME_KEY = operator.itemgetter(0)
+
+
+def _provider_identity(provider: SessionProvider) -> _ProviderIdentity:
+    env_var = provider.env_var
+    return (
+        provider.name,
+        provider.__class__.__module__,
+        provider.__class__.__qualname__,
+        str(provider.base_dir.expanduser()),
+        tuple(getattr(provider, "glob_patterns", ())),
+        env_var,
+        os.getenv(env_var, "") if env_var else "",
+    )
 
 
-def _canonical_path(path: Path) -> Path | None:
+def _canonical_path(path: Path) -> str | None:
+    # Same result as str(path.expanduser().resolve()), without building the
+    # intermediate Path objects for every file in the manifest.
     try:
-        return path.expanduser().resolve(strict=False)
+        return os.path.realpath(os.path.expanduser(path))
     except OSError:
         return None
 
@@ -4,13 +4,12 @@ Data models used across Agent Sessions components.
 
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Literal
 
-from .util import strip_private_use
+from .util import render_json, strip_private_use_lower
 
 
 @dataclass
@@ -70,10 +69,22 @@ class SessionRecord:
     messages: list[Message] = field(default_factory=list)
     normalized_messages: list[NormalizedMessage] = field(default_factory=list)
     normalization_diagnostics: NormalizationDiagnostics | None = None
-    search_index: SessionSearchIndex = field(init=False, repr=False, compare=False)
+    # Built on first access: only search needs it, and most loaded sessions
+    # are listed or shown without ever being searched.
+    _search_index: SessionSearchIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
-    def __post_init__(self) -> None:
-        self.refresh_search_index()
+    @property
+    def search_index(self) -> SessionSearchIndex:
+        index = self._search_index
+        if index is None:
+            index = self.refresh_search_index()
+        return index
+
+    @search_index.deleter
+    def search_index(self) -> None:
+        self._search_index = None
 
     @property
     def first_message(self) -> Message | None:
@@ -89,87 +100,115 @@ class SessionRecord:
 
     def refresh_search_index(self) -> SessionSearchIndex:
         index = SessionSearchIndex.from_session(self)
-        object.__setattr__(self, "search_index", index)
+        self._search_index = index
         return index
 
 
+# Joins the searchable fields into one haystack. Fields and search terms have
+# the character replaced by a space, so a term still matches within a single
+# field, as it did when fields were searched one by one, and the fields can be
+# split back out.
+_SEARCH_FIELD_SEPARATOR = b"\x1f"
+
+
 @dataclass(slots=True)
 class SessionSearchIndex:
-    provider: str
-    session_id: str
-    model: str
-    working_dir: str
-    messages: tuple[str, ...]
+    """
+    Lowercased searchable text of a session, fused into one UTF-8 buffer.
+
+    The header fields (provider, session id, model, working dir) come first,
+    followed by the non-empty message blobs, so a search is a single
+    substring scan instead of one per field. UTF-8 keeps the buffer one byte
+    per ASCII character even when the text holds wide characters, and a
+    UTF-8 needle can only match at character boundaries.
+    """
+
+    haystack: bytes
 
     @classmethod
     def from_session(cls, session: SessionRecord) -> SessionSearchIndex:
-        message_blobs: list[str] = []
+        fields = [
+            _normalize_for_search(session.provider),
+            _normalize_for_search(session.session_id),
+            _normalize_for_search(session.model),
+            _normalize_for_search(session.working_dir),
+        ]
         if session.normalized_messages:
             for message in session.normalized_messages:
                 blob = _normalize_for_search(_flatten_normalized_message(message))
                 if blob:
-                    message_blobs.append(blob)
+                    fields.append(blob)
         else:
             for message in session.messages:
                 blob = _normalize_for_search(message.content)
                 if blob:
-                    message_blobs.append(blob)
+                    fields.append(blob)
+        haystack = _SEARCH_FIELD_SEPARATOR.join(field.encode("utf-8") for field in fields)
+        return cls(haystack=haystack)
+
+    @staticmethod
+    def build_term(term: str) -> bytes:
+        """Prepare a search term once for matching against many indexes."""
+        return term.lower().replace("\x1f", " ").encode("utf-8")
+
+    @property
+    def provider(self) -> str:
+        return self._fields()[0]
 
-        return cls(
-            provider=_normalize_for_search(session.provider),
-            session_id=_normalize_for_search(session.session_id),
-            model=_normalize_for_search(session.model),
-            working_dir=_normalize_for_search(session.working_dir),
-            messages=tuple(message_blobs),
-        )
+    @property
+    def session_id(self) -> str:
+        return self._fields()[1]
+
+    @property
+    def model(self) -> str:
+        return self._fields()[2]
+
+    @property
+    def working_dir(self) -> str:
+        return self._fields()[3]
+
+    @property
+    def messages(self) -> tuple[str, ...]:
+        return tuple(self._fields()[4:])
 
-    def matches(self, lowered_term: str) -> bool:
+    def matches(self, lowered_term: str | bytes) -> bool:
         if not lowered_term:
             return True
+        if isinstance(lowered_term, str):
+            lowered_term = lowered_term.encode("utf-8")
+        return lowered_term in self.haystack
+
+    def _fields(self) -> list[str]:
+        return [field.decode("utf-8") for field in self.haystack.split(_SEARCH_FIELD_SEPARATOR)]
+
 
-        for value in (self.provider, self.session_id, self.model, self.working_dir):
-            if value and lowered_term in value:
-                return True
-        for message in self.messages:
-            if lowered_term in message:
-                return True
-        return False
+_SEARCH_BLOB_LIMIT = 4000
 
 
 def _normalize_for_search(value: str | None) -> str:
-    if not value:
-        return ""
-    return strip_private_use(value).lower()
+    return strip_private_use_lower(value).replace("\x1f", " ")
 
 
 def _flatten_normalized_message(message: NormalizedMessage) -> str:
     chunks: list[str] = []
+    # Length of "\n".join(chunks); once past the cap, later parts cannot show
+    # up in the truncated blob, so they are not rendered at all.
+    length = -1
     for part in message.parts:
         if part.kind in {"text", "code"} and part.text:
-            chunks.append(part.text)
-            continue
-        if part.kind == "tool-call":
+            chunk = part.text
+        elif part.kind == "tool-call":
             name = part.tool_name or "tool"
-            args = _safe_json(part.arguments)
-            chunks.append(f"[tool-call] {name} {args}".strip())
-            continue
-        if part.kind == "tool-result":
+            args = render_json(part.arguments)
+            chunk = f"[tool-call] {name} {args}".strip()
+        elif part.kind == "tool-result":
             name = part.tool_name or "tool"
-            out = _safe_json(part.output)
-            chunks.append(f"[tool-result] {name} {out}".strip())
+            out = render_json(part.output)
+            chunk = f"[tool-result] {name} {out}".strip()
+        else:
             continue
-    value = "\n".join(chunk for chunk in chunks if chunk)
-    if len(value) > 4000:
-        return value[:4000] + "…"
-    return value
-
-
-def _safe_json(value: Any) -> str:
-    if value is None:
-        return ""
-    if isinstance(value, str):
-        return value
-    try:
-        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
-    except TypeError:
-        return str(value)
+        chunks.append(chunk)
+        length += len(chunk) + 1
+        if length > _SEARCH_BLOB_LIMIT:
+            return "\n".join(chunks)[:_SEARCH_BLOB_LIMIT] + "…"
+    return "\n".join(chunks)
@@ -8,7 +8,7 @@ NormalizedMessage objects with structured parts and correct roles.
 from __future__ import annotations
 
 import hashlib
-import json
+import sys
 from collections.abc import Iterable
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -20,7 +20,7 @@ from .model import (
     NormalizedPart,
     NormalizedRole,
 )
-from .util import stringify_content
+from .util import maybe_json, render_json, safe_json, stringify_content
 
 _ROLE_ALIASES: dict[str, NormalizedRole] = {
     "system": "system",
@@ -34,6 +34,9 @@ _ROLE_ALIASES: dict[str, NormalizedRole] = {
     "tool": "tool",
     "function": "tool",
 }
+_USER_ROLES = frozenset({"user", "human"})
+_TEXT_PART_KINDS = frozenset({"text", "code"})
+_MISSING = object()
 
 
 @dataclass
@@ -81,17 +84,12 @@ class Normalizer:
             self.diagnostics.skipped_events += 1
             return None
 
-        normalized_role = _resolve_role(extracted_role, parts)
-        if extracted_role and extracted_role.strip().lower() in {"user", "human"}:
-            if normalized_role == "tool" and not _ROLE_ALIASES.get(extracted_role.strip().lower()):
-                # should not happen, but keep the warning noisy if it does
-                self.diagnostics.warnings.append(
-                    f"{self.provider}: role override '{extracted_role}' -> 'tool'"
-                )
-            elif normalized_role == "tool":
-                self.diagnostics.warnings.append(
-                    f"{self.provider}: role override '{extracted_role}' -> 'tool'"
-                )
+        lowered_role = extracted_role.strip().lower() if extracted_role else ""
+        normalized_role = _resolve_role(_ROLE_ALIASES.get(lowered_role), parts)
+        if normalized_role == "tool" and lowered_role in _USER_ROLES:
+            self.diagnostics.warnings.append(
+                f"{self.provider}: role override '{extracted_role}' -> 'tool'"
+            )
 
         msg_id = (
             _clean_str(message_id)
@@ -136,26 +134,31 @@ def render_legacy_content(message: NormalizedMessage) -> str:
             continue
         if part.kind == "tool-call":
             tool_name = part.tool_name or "tool"
-            args = _safe_json(part.arguments)
+            args = render_json(part.arguments)
             chunks.append(f"[tool-call] {tool_name} {args}".strip())
             continue
         if part.kind == "tool-result":
             tool_name = part.tool_name or "tool"
-            out = _safe_json(part.output)
+            out = render_json(part.output)
             chunks.append(f"[tool-result] {tool_name} {out}".strip())
             continue
     return "\n".join(chunk for chunk in chunks if chunk).strip()
 
 
 def _extract_content(payload: dict[str, Any]) -> Any:
-    if "content" in payload:
-        return payload.get("content")
-    if "parts" in payload:
-        return payload.get("parts")
-    if "message" in payload and isinstance(payload.get("message"), dict):
-        nested = payload.get("message") or {}
-        if "content" in nested or "parts" in nested:
-            return nested.get("content") if "content" in nested else nested.get("parts")
+    # One lookup per key: the sentinel tells "absent" apart from a None value.
+    content = payload.get("content", _MISSING)
+    if content is not _MISSING:
+        return content
+    content = payload.get("parts", _MISSING)
+    if content is not _MISSING:
+        return content
+    nested = payload.get("message")
+    if isinstance(nested, dict):
+        content = nested.get("content", _MISSING)
+        if content is not _MISSING:
+            return content
+        return nested.get("parts")
     return None
 
 
@@ -208,21 +211,12 @@ def _extract_timestamp(payload: dict[str, Any]) -> datetime | None:
     return None
 
 
-def _resolve_role(role: str | None, parts: list[NormalizedPart]) -> NormalizedRole:
-    lowered = (role or "").strip().lower()
-    base = _ROLE_ALIASES.get(lowered)
-
-    has_tool_result = any(part.kind == "tool-result" for part in parts)
-    has_tool_call = any(part.kind == "tool-call" for part in parts)
-
-    if has_tool_result:
+def _resolve_role(base: NormalizedRole | None, parts: list[NormalizedPart]) -> NormalizedRole:
+    if any(part.kind == "tool-result" for part in parts):
         return "tool"
-    if base in {"system", "user", "assistant", "tool"}:
-        return base
-    if has_tool_call:
-        return "assistant"
-    # Default to assistant to avoid mis-attributing provider events as user messages.
-    return "assistant"
+    # Unknown roles, with or without tool calls, default to assistant to avoid
+    # mis-attributing provider events as user messages.
+    return base or "assistant"
 
 
 def _parts_from_content(content: Any) -> list[NormalizedPart]:
@@ -327,7 +321,7 @@ def _parts_from_openai_tool_calls(payload: dict[str, Any]) -> list[NormalizedPar
         )
         args: Any = args_raw
         if isinstance(args_raw, str):
-            parsed = _maybe_json(args_raw)
+            parsed = maybe_json(args_raw)
             args = parsed if parsed is not None else args_raw
         parts.append(
             NormalizedPart(
@@ -348,7 +342,7 @@ def _parts_from_openai_function_call(payload: dict[str, Any]) -> list[Normalized
     args_raw = call.get("arguments")
     args: Any = args_raw
     if isinstance(args_raw, str):
-        parsed = _maybe_json(args_raw)
+        parsed = maybe_json(args_raw)
         args = parsed if parsed is not None else args_raw
     if not tool_name and args is None:
         return []
@@ -394,26 +388,22 @@ def _parts_from_tool_result_payload(payload: dict[str, Any]) -> list[NormalizedP
 
 
 def _compact_parts(parts: list[NormalizedPart]) -> list[NormalizedPart]:
-    compacted: list[NormalizedPart] = []
+    # The parts were just built by the _parts_from_* helpers and are not shared
+    # yet, so strip text in place and drop empty parts without reallocating.
+    kept = 0
     for part in parts:
-        if part.kind in {"text", "code"} and part.text is not None:
+        if part.kind in _TEXT_PART_KINDS and part.text is not None:
             stripped = part.text.strip()
             if not stripped:
                 continue
-            compacted.append(
-                NormalizedPart(
-                    kind=part.kind,
-                    text=stripped,
-                    language=part.language,
-                    tool_name=part.tool_name,
-                    arguments=part.arguments,
-                    output=part.output,
-                    id=part.id,
-                )
-            )
-        else:
-            compacted.append(part)
-    return compacted
+            part.text = stripped
+        elif part.tool_name:
+            # Tool names recur across a session; share one string per name.
+            part.tool_name = sys.intern(part.tool_name)
+        parts[kept] = part
+        kept += 1
+    del parts[kept:]
+    return parts
 
 
 def _stable_message_id(
@@ -424,29 +414,21 @@ def _stable_message_id(
     parts: Iterable[NormalizedPart],
     sequence: int,
 ) -> str:
-    hasher = hashlib.sha1()
-    hasher.update(provider.encode("utf-8"))
-    hasher.update(b"\0")
-    hasher.update(role.encode("utf-8"))
-    hasher.update(b"\0")
-    hasher.update((timestamp.isoformat() if timestamp else "").encode("utf-8"))
-    hasher.update(b"\0")
+    # One NUL-joined buffer hashes to the same digest as feeding each field
+    # and separator to the hasher in turn, with a single encode and update.
+    fields = [provider, role, timestamp.isoformat() if timestamp else ""]
     for part in parts:
-        hasher.update(part.kind.encode("utf-8"))
-        hasher.update(b"\0")
-        hasher.update((part.text or "").encode("utf-8"))
-        hasher.update(b"\0")
-        hasher.update((part.language or "").encode("utf-8"))
-        hasher.update(b"\0")
-        hasher.update((part.tool_name or "").encode("utf-8"))
-        hasher.update(b"\0")
-        hasher.update(_safe_json(part.arguments).encode("utf-8"))
-        hasher.update(b"\0")
-        hasher.update(_safe_json(part.output).encode("utf-8"))
-        hasher.update(b"\0")
-        hasher.update((part.id or "").encode("utf-8"))
-        hasher.update(b"\0")
-    hasher.update(str(sequence).encode("utf-8"))
+        fields += (
+            part.kind,
+            part.text or "",
+            part.language or "",
+            part.tool_name or "",
+            safe_json(part.arguments),
+            safe_json(part.output),
+            part.id or "",
+        )
+    fields.append(str(sequence))
+    hasher = hashlib.sha1("\0".join(fields).encode("utf-8"))
     return f"{provider}:{hasher.hexdigest()}"
 
 
@@ -455,24 +437,3 @@ def _clean_str(value: Any) -> str | None:
         return None
     cleaned = value.strip()
     return cleaned if cleaned else None
-
-
-def _safe_json(value: Any) -> str:
-    if value is None:
-        return ""
-    if isinstance(value, str):
-        return value
-    try:
-        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
-    except TypeError:
-        return str(value)
-
-
-def _maybe_json(value: str) -> Any | None:
-    stripped = value.strip()
-    if not stripped or stripped[0] not in ("{", "["):
-        return None
-    try:
-        return json.loads(stripped)
-    except json.JSONDecodeError:
-        return None
@@ -12,6 +12,7 @@ from typing import TYPE_CHECKING
 
 from ..model import SessionRecord
 from .ingest import JsonlReader, SessionBuilder, iter_paths
+from .parallel import MIN_PARALLEL_FILES, parse_in_processes, parse_workers
 
 if TYPE_CHECKING:
     from ..cache import DiskSessionCache
@@ -25,6 +26,9 @@ class SessionProvider:
     home_subdir: str | None = None
     glob_patterns: Sequence[str] = ()
     sort_descending: bool = True
+    # Worker processes rebuild the provider as ``type(self)(self.base_dir)``;
+    # only set this when parsing a file depends on nothing else.
+    parallel_safe: bool = False
 
     def __init__(self, base_dir: Path | None = None) -> None:
         self.base_dir = base_dir or self.default_base_dir()
@@ -102,13 +106,28 @@ class SessionProvider:
         return dt.timestamp() if isinstance(dt, datetime) else float("-inf")
 
     def _collect_sessions(self) -> Iterator[SessionRecord]:
-        for path in self.session_paths():
-            record = self._build_session_from_path_cached(path)
-            if not record:
-                continue
-            processed = self.post_process(record)
-            if processed:
-                yield processed
+        cache = self._cache
+        paths: Iterable[Path] = self.session_paths()
+        workers = parse_workers() if self.parallel_safe else 0
+        if cache or workers:
+            paths = list(paths)
+        if cache:
+            cache.prime(paths, self.name)
+        try:
+            records: Iterable[SessionRecord | None]
+            if workers and isinstance(paths, list) and len(paths) >= MIN_PARALLEL_FILES:
+                records = self._build_sessions_in_processes(paths, workers)
+            else:
+                records = map(self._build_session_from_path_cached, paths)
+            for record in records:
+                if not record:
+                    continue
+                processed = self.post_process(record)
+                if processed:
+                    yield processed
+        finally:
+            if cache:
+                cache.discard_primed()
 
     def _build_session_from_path_cached(self, path: Path) -> SessionRecord | None:
         cache = self._cache
@@ -121,6 +140,24 @@ class SessionProvider:
             cache.store(self.name, path, record)
         return record
 
+    def _build_sessions_in_processes(
+        self, paths: list[Path], workers: int
+    ) -> list[SessionRecord | None]:
+        # Cache hits are served here; only the misses are worth a worker trip.
+        cache = self._cache
+        records = [cache.lookup(self.name, path) if cache else None for path in paths]
+        missing = [index for index, record in enumerate(records) if not record]
+        parsed: list[SessionRecord | None] | None = None
+        if len(missing) >= MIN_PARALLEL_FILES:
+            parsed = parse_in_processes(self, [paths[index] for index in missing], workers)
+        if parsed is None:
+            parsed = [self._build_session_from_path(paths[index]) for index in missing]
+        for index, record in zip(missing, parsed, strict=True):
+            records[index] = record
+            if record and cache:
+                cache.store(self.name, paths[index], record)
+        return records
+
     def _build_session_from_path(self, path: Path) -> SessionRecord | None:
         builder = self.create_builder(path)
         for event in self.iter_events(path):
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 import sqlite3
 from collections import defaultdict
@@ -10,14 +11,48 @@ from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
 from ..model import Message, SessionRecord
 from ..normalize import Normalizer
-from ..util import coalesce, parse_timestamp, stringify_content
+from ..util import maybe_json, parse_timestamp, stringify_content
 from .base import SessionProvider
 from .ingest import SessionBuilder, merge_session_records
 from .logging import debug_warning
 
+# Rows are fetched from the store in batches of this many.
+_FETCH_BATCH_SIZE = 10_000
+# Read-only connection settings: map the file instead of copying pages through
+# read() and keep up to 64 MiB of pages cached.
+_STORE_PRAGMAS = (
+    "PRAGMA query_only = 1",
+    "PRAGMA mmap_size = 1073741824",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+)
+# Store tables the loader knows how to read, across Claude CLI releases.
+_PROJECT_TABLES = ("projects", "project_metadata")
+_CONVERSATION_META_TABLES = ("conversations", "conversation_summaries")
+_MESSAGE_TABLES: tuple[tuple[str, str | None], ...] = (
+    ("conversation_messages", None),
+    ("messages", None),
+    ("base_messages", None),
+    ("assistant_messages", "assistant"),
+    ("user_messages", "user"),
+)
+_STORE_TABLES = frozenset(
+    (*_PROJECT_TABLES, *_CONVERSATION_META_TABLES, *(table for table, _ in _MESSAGE_TABLES))
+)
+
+_EVENT_TIMESTAMP_KEYS = ("timestamp", "created_at", "time", "ts")
+_MESSAGE_TIMESTAMP_KEYS = ("timestamp", "createdAt")
+
+# Keys that may hold a working directory, in order of preference.
+_WORKDIR_KEYS = ("cwd", "workspace_root", "project_path")
+_WORKDIR_CONTAINERS = ("workspace", "project", "session", "context")
+_NESTED_WORKDIR_KEYS = ("cwd", "workspace_root", "project_path", "root", "path")
+_PROJECT_PATH_KEYS = ("absolutePath", "projectPath", "workspaceRoot", "rootPath", "path")
+
 _UUID_PATTERN = re.compile(
     r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$",
     re.IGNORECASE,
@@ -66,56 +101,58 @@ def _project_workdir(project_dir: Path) -> str | None:
         except (OSError, json.JSONDecodeError) as exc:
             debug_warning(f"Skipping unreadable project metadata {candidate}", exc)
             continue
-        for key in ("absolutePath", "projectPath", "workspaceRoot", "rootPath", "path"):
-            value = payload.get(key)
-            if isinstance(value, str) and value.strip():
-                return value
+        found = _first_nonblank(payload, _PROJECT_PATH_KEYS)
+        if found is not None:
+            return found
         for container in ("project", "workspace", "meta"):
             nested = payload.get(container)
             if isinstance(nested, dict):
-                for key in (
-                    "absolutePath",
-                    "projectPath",
-                    "workspaceRoot",
-                    "rootPath",
-                    "path",
-                ):
-                    value = nested.get(key)
-                    if isinstance(value, str) and value.strip():
-                        return value
+                found = _first_nonblank(nested, _PROJECT_PATH_KEYS)
+                if found is not None:
+                    return found
     return None
 
 
 def _claude_event_timestamp(event: dict) -> datetime | None:
-    payload = event.get("message") if isinstance(event.get("message"), dict) else {}
-    return parse_timestamp(
-        coalesce(
-            event.get("timestamp"),
-            event.get("created_at"),
-            event.get("time"),
-            event.get("ts"),
-            payload.get("timestamp") if isinstance(payload, dict) else None,
-            payload.get("createdAt") if isinstance(payload, dict) else None,
-        )
-    )
+    # Same precedence as coalesce() over all six fields, but the message
+    # payload is only consulted when the event itself has no timestamp.
+    value = _first_present(event, _EVENT_TIMESTAMP_KEYS)
+    if value is None:
+        payload = event.get("message")
+        if isinstance(payload, dict):
+            value = _first_present(payload, _MESSAGE_TIMESTAMP_KEYS)
+    return parse_timestamp(value)
+
+
+def _first_present(mapping: dict, keys: tuple[str, ...]) -> Any | None:
+    for key in keys:
+        value = mapping.get(key)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        return value
+    return None
 
 
 def _claude_event_workdir(event: dict) -> str | None:
-    candidates = [
-        event.get("cwd"),
-        event.get("workspace_root"),
-        event.get("project_path"),
-    ]
-    for key in ("workspace", "project", "session", "context"):
+    # Most events carry "cwd" at the top level, so nested containers are only
+    # probed once the flat keys come up empty.
+    found = _first_nonblank(event, _WORKDIR_KEYS)
+    if found is not None:
+        return found
+    for key in _WORKDIR_CONTAINERS:
         nested = event.get(key)
         if isinstance(nested, dict):
-            candidates.extend(
-                nested.get(field)
-                for field in ("cwd", "workspace_root", "project_path", "root", "path")
-            )
-    for candidate in candidates:
-        if isinstance(candidate, str) and candidate.strip():
-            return candidate
+            found = _first_nonblank(nested, _NESTED_WORKDIR_KEYS)
+            if found is not None:
+                return found
+    return None
+
+
+def _first_nonblank(mapping: dict, keys: tuple[str, ...]) -> str | None:
+    for key in keys:
+        value = mapping.get(key)
+        if isinstance(value, str) and value.strip():
+            return value
     return None
 
 
@@ -174,17 +211,21 @@ def _ingest_store_logs(db_path: Path, records: dict[str, SessionRecord]) -> None
 
 
 def _load_store_sessions(db_path: Path) -> list[SessionRecord]:
+    if not db_path.is_file():
+        return []
     try:
-        connection = sqlite3.connect(db_path)
-        connection.row_factory = sqlite3.Row
+        connection = _open_store(db_path)
     except sqlite3.Error as exc:
         debug_warning(f"Unable to open Claude store database {db_path}", exc)
         return []
 
     try:
-        project_paths = _collect_project_paths(connection)
-        meta = _collect_conversation_meta(connection)
-        messages = _collect_conversation_messages(connection)
+        # One read transaction, so all tables are read from the same snapshot.
+        connection.execute("BEGIN")
+        schema = _read_schema(connection)
+        project_paths = _collect_project_paths(connection, schema)
+        meta = _collect_conversation_meta(connection, schema)
+        messages = _collect_conversation_messages(connection, schema)
     finally:
         connection.close()
 
@@ -193,20 +234,28 @@ def _load_store_sessions(db_path: Path) -> list[SessionRecord]:
         if not message_list:
             continue
 
+        # Normalize in stored order so the sequence-based message ids stay put,
+        # then sort once: each normalized message carries its source message's
+        # timestamp, so one ordering serves both lists.
         normalizer = Normalizer(provider="claude-code")
-        normalized_messages = []
-        for msg in message_list:
-            normalized = normalizer.normalize_message(
+        normalized = [
+            normalizer.normalize_message(
                 {"role": msg.role, "content": msg.content},
                 timestamp=msg.created_at,
                 role=msg.role,
             )
-            if normalized:
-                normalized_messages.append(normalized)
+            for msg in message_list
+        ]
+        times = [_message_time(msg) for msg in message_list]
+        order = sorted(range(len(message_list)), key=times.__getitem__)
+        ordered_messages = [message_list[index] for index in order]
+        normalized_messages = [normalized[index] for index in order if normalized[index]]
 
         metadata = meta.get(conversation_id, ConversationMeta())
-        started_at = min((msg.created_at for msg in message_list if msg.created_at), default=None)
-        updated_at = max((msg.created_at for msg in message_list if msg.created_at), default=None)
+        # Undated messages sort first, so the ends of the ordering are the
+        # earliest and latest timestamps.
+        started_at = next((msg.created_at for msg in ordered_messages if msg.created_at), None)
+        updated_at = ordered_messages[-1].created_at
 
         working_dir = metadata.working_dir
         project_id = metadata.project_id
@@ -224,23 +273,40 @@ def _load_store_sessions(db_path: Path) -> list[SessionRecord]:
                 started_at=metadata_started,
                 updated_at=metadata_updated,
                 working_dir=working_dir,
-                messages=sorted(
-                    message_list,
-                    key=lambda msg: (
-                        msg.created_at.timestamp() if msg.created_at else float("-inf")
-                    ),
-                ),
-                normalized_messages=sorted(
-                    normalized_messages,
-                    key=lambda msg: (msg.timestamp.timestamp() if msg.timestamp else float("-inf")),
-                ),
+                messages=ordered_messages,
+                normalized_messages=normalized_messages,
                 normalization_diagnostics=normalizer.diagnostics,
             )
         )
     return sessions
 
 
-def _collect_project_paths(connection: sqlite3.Connection) -> dict[str, str]:
+def _message_time(message: Message) -> float:
+    return message.created_at.timestamp() if message.created_at else float("-inf")
+
+
+def _open_store(db_path: Path) -> sqlite3.Connection:
+    """
+    Open the Claude store read-only, tuned for a few full-table scans.
+
+    The database belongs to the Claude CLI, which may be writing to it, so
+    nothing here changes the file: no journal-mode switch and no immutable
+    flag that would skip locking.
+    """
+    uri = f"{db_path.resolve().as_uri()}?mode=ro"
+    connection = sqlite3.connect(uri, uri=True)
+    try:
+        for pragma in _STORE_PRAGMAS:
+            connection.execute(pragma)
+    except sqlite3.Error:
+        connection.close()
+        raise
+    return connection
+
+
+def _collect_project_paths(
+    connection: sqlite3.Connection, schema: dict[str, set[str]]
+) -> dict[str, str]:
     """
     Map project identifiers to filesystem paths.
 
@@ -248,10 +314,10 @@ def _collect_project_paths(connection: sqlite3.Connection) -> dict[str, str]:
     tolerate missing tables instead of assuming a fixed layout.
     """
     paths: dict[str, str] = {}
-    for table in ("projects", "project_metadata"):
-        if not _table_exists(connection, table):
+    for table in _PROJECT_TABLES:
+        columns = schema.get(table)
+        if not columns:
             continue
-        columns = _table_columns(connection, table)
         id_column = _first_key(columns, ("id", "project_id", "uuid"))
         path_column = _first_key(
             columns,
@@ -264,16 +330,14 @@ def _collect_project_paths(connection: sqlite3.Connection) -> dict[str, str]:
         except sqlite3.Error as exc:
             debug_warning(f"Failed to read project paths from {table}", exc)
             continue
-        for row in cursor:
-            identifier = row[id_column]
-            raw_path = row[path_column]
+        for identifier, raw_path in cursor:
             if isinstance(identifier, str | int) and isinstance(raw_path, str) and raw_path.strip():
                 paths[str(identifier)] = raw_path
     return paths
 
 
 def _collect_conversation_meta(
-    connection: sqlite3.Connection,
+    connection: sqlite3.Connection, schema: dict[str, set[str]]
 ) -> dict[str, ConversationMeta]:
     """
     Extract working directory metadata and timestamps for each conversation.
@@ -283,13 +347,13 @@ def _collect_conversation_meta(
     gracefully skip tables that cannot be queried.
     """
     meta: dict[str, ConversationMeta] = {}
-    for table in ("conversations", "conversation_summaries"):
-        _ingest_conversation_meta_table(connection, table, meta)
+    for table in _CONVERSATION_META_TABLES:
+        _ingest_conversation_meta_table(connection, table, schema.get(table), meta)
     return meta
 
 
 def _collect_conversation_messages(
-    connection: sqlite3.Connection,
+    connection: sqlite3.Connection, schema: dict[str, set[str]]
 ) -> dict[str, list[Message]]:
     """
     Gather message content for each conversation across multiple possible tables.
@@ -299,24 +363,19 @@ def _collect_conversation_messages(
     Message objects, skipping rows with no usable content.
     """
     conversations: dict[str, list[Message]] = defaultdict(list)
-    message_tables = [
-        ("conversation_messages", None),
-        ("messages", None),
-        ("base_messages", None),
-        ("assistant_messages", "assistant"),
-        ("user_messages", "user"),
-    ]
-    for table, default_role in message_tables:
-        _ingest_message_table(connection, table, default_role, conversations)
+    for table, default_role in _MESSAGE_TABLES:
+        _ingest_message_table(connection, table, schema.get(table), default_role, conversations)
     return conversations
 
 
 def _ingest_conversation_meta_table(
-    connection: sqlite3.Connection, table: str, meta: dict[str, ConversationMeta]
+    connection: sqlite3.Connection,
+    table: str,
+    columns: set[str] | None,
+    meta: dict[str, ConversationMeta],
 ) -> None:
-    if not _table_exists(connection, table):
+    if not columns:
         return
-    columns = _table_columns(connection, table)
     id_column = _first_key(columns, ("conversation_id", "conversation_uuid", "id", "uuid"))
     if not id_column:
         return
@@ -333,38 +392,45 @@ def _ingest_conversation_meta_table(
         )
         if key in columns
     ]
+    nested_columns = [key for key in ("metadata", "project", "workspace", "data") if key in columns]
     timestamp_columns = [
         key
         for key in ("created_at", "started_at", "updated_at", "last_activity_at")
         if key in columns
     ]
+    # Select only the probed columns, laid out as
+    # id, project, working dirs..., nested JSON..., timestamps...
+    selected = [id_column, project_column or "NULL"]
+    selected += working_dir_columns + nested_columns + timestamp_columns
+    nested_start = 2 + len(working_dir_columns)
+    timestamp_start = nested_start + len(nested_columns)
     try:
-        cursor = connection.execute(f"SELECT * FROM {table}")
+        cursor = connection.execute(f"SELECT {', '.join(selected)} FROM {table}")
     except sqlite3.Error as exc:
         debug_warning(f"Failed to read conversation metadata from {table}", exc)
         return
 
-    for row in cursor:
-        _merge_conversation_meta(
-            meta,
-            row,
-            columns,
-            id_column,
-            project_column,
-            working_dir_columns,
-            timestamp_columns,
-        )
+    while batch := cursor.fetchmany(_FETCH_BATCH_SIZE):
+        for row in batch:
+            _merge_conversation_meta(
+                meta,
+                row[0],
+                row[1],
+                row[2:nested_start],
+                row[nested_start:timestamp_start],
+                row[timestamp_start:],
+            )
 
 
 def _ingest_message_table(
     connection: sqlite3.Connection,
     table: str,
+    columns: set[str] | None,
     default_role: str | None,
     conversations: dict[str, list[Message]],
 ) -> None:
-    if not _table_exists(connection, table):
+    if not columns:
         return
-    columns = _table_columns(connection, table)
     conversation_column = _first_key(
         columns,
         ("conversation_id", "conversation_uuid", "conversation", "session_id", "session_uuid"),
@@ -379,67 +445,63 @@ def _ingest_message_table(
         if key in columns
     ]
     timestamp_column = _first_key(columns, ("created_at", "timestamp", "time", "ts"))
+    # Select only the probed columns, laid out as
+    # conversation, roles..., contents..., timestamp.
+    selected = [conversation_column, *role_columns, *content_columns, timestamp_column or "NULL"]
+    content_start = 1 + len(role_columns)
 
     try:
-        cursor = connection.execute(f"SELECT * FROM {table}")
+        cursor = connection.execute(f"SELECT {', '.join(selected)} FROM {table}")
     except sqlite3.Error as exc:
         debug_warning(f"Failed to read conversation messages from {table}", exc)
         return
 
-    for row in cursor:
-        conversation_id, message = _extract_message_row(
-            row,
-            default_role,
-            conversation_column,
-            role_columns,
-            content_columns,
-            timestamp_column,
-        )
-        if conversation_id and message:
-            conversations[conversation_id].append(message)
+    while batch := cursor.fetchmany(_FETCH_BATCH_SIZE):
+        for row in batch:
+            conversation_id, message = _extract_message_row(
+                row[0],
+                row[1:content_start],
+                row[content_start:-1],
+                row[-1],
+                default_role,
+            )
+            if conversation_id and message:
+                conversations[conversation_id].append(message)
 
 
 def _merge_conversation_meta(
     meta: dict[str, ConversationMeta],
-    row: sqlite3.Row,
-    columns: set[str],
-    id_column: str,
-    project_column: str | None,
-    working_dir_columns: list[str],
-    timestamp_columns: list[str],
+    conversation_id: object,
+    proj_value: object,
+    working_dir_values: tuple,
+    nested_values: tuple,
+    timestamp_values: tuple,
 ) -> None:
-    conversation_id = row[id_column]
     if conversation_id is None:
         return
     conv_key = str(conversation_id)
     entry = meta.setdefault(conv_key, ConversationMeta())
 
-    if project_column and entry.project_id is None:
-        proj_value = row[project_column]
-        if proj_value is not None:
-            entry.project_id = str(proj_value)
+    if entry.project_id is None and proj_value is not None:
+        entry.project_id = str(proj_value)
 
     if entry.working_dir is None:
-        for key in working_dir_columns:
-            value = row[key]
+        for value in working_dir_values:
             if isinstance(value, str) and value.strip():
                 entry.working_dir = value
                 break
 
     if entry.working_dir is None:
-        for key in ("metadata", "project", "workspace", "data"):
-            if key not in columns:
-                continue
-            value = row[key]
-            nested = _maybe_json(value) if isinstance(value, str) else value
+        for value in nested_values:
+            nested = maybe_json(value) if isinstance(value, str) else value
             if isinstance(nested, dict):
                 candidate = _claude_event_workdir(nested)
                 if candidate:
                     entry.working_dir = candidate
                     break
 
-    for key in timestamp_columns:
-        parsed = parse_timestamp(row[key])
+    for value in timestamp_values:
+        parsed = parse_timestamp(value)
         if parsed is None:
             continue
         if entry.started_at is None or parsed < entry.started_at:
@@ -449,20 +511,17 @@ def _merge_conversation_meta(
 
 
 def _extract_message_row(
-    row: sqlite3.Row,
+    conversation_id: object,
+    role_values: tuple,
+    content_values: tuple,
+    raw_timestamp: object,
     default_role: str | None,
-    conversation_column: str,
-    role_columns: list[str],
-    content_columns: list[str],
-    timestamp_column: str | None,
 ) -> tuple[str | None, Message | None]:
-    conversation_id = row[conversation_column]
     if conversation_id is None:
         return None, None
 
     role_value = None
-    for key in role_columns:
-        value = row[key]
+    for value in role_values:
         if isinstance(value, str) and value.strip():
             role_value = value
             break
@@ -470,12 +529,11 @@ def _extract_message_row(
         role_value = default_role or "event"
 
     content_value = None
-    for key in content_columns:
-        value = row[key]
+    for value in content_values:
         if value is None:
             continue
         if isinstance(value, str):
-            maybe = _maybe_json(value)
+            maybe = maybe_json(value)
             content_value = maybe if maybe is not None else value
         else:
             content_value = value
@@ -486,30 +544,24 @@ def _extract_message_row(
     if not text and not role_value:
         return None, None
 
-    timestamp = parse_timestamp(row[timestamp_column]) if timestamp_column else None
+    timestamp = parse_timestamp(raw_timestamp)
     message = Message(role=role_value or "event", content=text, created_at=timestamp)
     return str(conversation_id), message
 
 
-def _maybe_json(value: str):
-    stripped = value.strip()
-    if not stripped or stripped[0] not in ("{", "["):
-        return None
-    try:
-        return json.loads(stripped)
-    except json.JSONDecodeError:
-        return None
-
+def _read_schema(connection: sqlite3.Connection) -> dict[str, set[str]]:
+    """
+    Map each store table the loader reads to its column names.
 
-def _table_exists(connection: sqlite3.Connection, table: str) -> bool:
+    Read once per load, so probing the candidate tables costs no queries; other
+    tables in the store are never inspected.
+    """
     try:
-        cursor = connection.execute(
-            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1",
-            (table,),
-        )
-        return cursor.fetchone() is not None
+        cursor = connection.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor if row[0] in _STORE_TABLES]
     except sqlite3.Error:
-        return False
+        return {}
+    return {table: _table_columns(connection, table) for table in tables}
 
 
 def _table_columns(connection: sqlite3.Connection, table: str) -> set[str]:
@@ -532,10 +584,13 @@ class ClaudeProvider(SessionProvider):
     env_var = "CLAUDE_HOME"
     home_subdir = ".claude"
     glob_patterns = ("projects/*/**/*.jsonl",)
+    parallel_safe = True
 
     def __init__(self, base_dir: Path | None = None) -> None:
         super().__init__(base_dir=base_dir)
-        self._workdir_cache: dict[Path, str | None] = {}
+        self._projects_root = self.base_dir / "projects"
+        self._projects_prefix = os.path.join(self._projects_root, "")
+        self._workdir_cache: dict[str, str | None] = {}
 
     def session_id_from_path(self, path: Path) -> str:
         return _claude_session_id(path)
@@ -599,15 +654,15 @@ class ClaudeProvider(SessionProvider):
             yield store_db
 
     def _project_workdir_for(self, path: Path) -> str | None:
-        try:
-            relative = path.relative_to(self.base_dir / "projects")
-        except ValueError:
-            return None
-        if not relative.parts:
+        # Session paths are built by joining onto base_dir, so a string prefix
+        # test stands in for relative_to() and the project name keys the cache.
+        raw = os.fspath(path)
+        prefix = self._projects_prefix
+        if not raw.startswith(prefix) or len(raw) == len(prefix):
             return None
-        project_dir = self.base_dir / "projects" / relative.parts[0]
-        if project_dir in self._workdir_cache:
-            return self._workdir_cache[project_dir]
-        workdir = _project_workdir(project_dir)
-        self._workdir_cache[project_dir] = workdir
+        project = raw[len(prefix) :].split(os.sep, 1)[0]
+        if project in self._workdir_cache:
+            return self._workdir_cache[project]
+        workdir = _project_workdir(self._projects_root / project)
+        self._workdir_cache[project] = workdir
         return workdir
@@ -115,6 +115,7 @@ class CodexProvider(SessionProvider):
     env_var = "CODEX_HOME"
     home_subdir = ".codex"
     glob_patterns = ("sessions/*/*/*/*.jsonl",)
+    parallel_safe = True
 
     def session_id_from_path(self, path: Path) -> str:
         stem_parts = path.stem.split("-")
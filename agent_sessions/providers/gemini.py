@@ -187,6 +187,7 @@ class GeminiProvider(SessionProvider):
     env_var = "GEMINI_HOME"
     home_subdir = ".gemini"
     glob_patterns: tuple[str, ...] = ()
+    parallel_safe = True
 
     def session_paths(self) -> Iterable[Path]:
         return _gemini_candidate_files(self.base_dir)
@@ -4,16 +4,29 @@ Shared ingestion helpers for session providers.
 
 from __future__ import annotations
 
-import json
-from collections.abc import Iterator, Sequence
+import fnmatch
+import functools
+import os
+import re
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
 from ..model import Message, NormalizationDiagnostics, NormalizedMessage, SessionRecord
 from ..normalize import render_legacy_content
+from ..util import parse_json
 from .logging import debug_warning
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+# orjson parses UTF-8 bytes directly, so skip the text layer's decoding; the
+# stdlib parser is faster on text than on bytes it has to decode per line.
+_JSONL_MODE, _JSONL_ENCODING = ("rb", None) if orjson is not None else ("r", "utf-8")
+
 
 class JsonlReader:
     """Iterate JSONL files with resilient decoding."""
@@ -23,14 +36,20 @@ class JsonlReader:
 
     def __iter__(self) -> Iterator[dict]:
         try:
-            with self.path.open("r", encoding="utf-8") as handle:
+            with self.path.open(_JSONL_MODE, encoding=_JSONL_ENCODING) as handle:
                 for raw_line in handle:
                     line = raw_line.strip()
                     if not line:
                         continue
+                    if isinstance(line, bytes) and (line[0] > 0x7F or line[-1] > 0x7F):
+                        # bytes.strip() only knows ASCII whitespace; strip the
+                        # rare non-ASCII edge as text so both modes agree.
+                        line = _decode_line(line)
+                        if not line:
+                            continue
                     try:
-                        payload = json.loads(line)
-                    except json.JSONDecodeError as exc:
+                        payload = parse_json(line)
+                    except ValueError as exc:
                         debug_warning(f"Discarding invalid JSON in {self.path}", exc)
                         continue
                     if isinstance(payload, dict):
@@ -40,18 +59,117 @@ class JsonlReader:
             return
 
 
+def _decode_line(line: bytes) -> str | bytes:
+    try:
+        return line.decode("utf-8").strip()
+    except UnicodeDecodeError:
+        # Undecodable: parse_json rejects it as invalid JSON.
+        return line
+
+
 def iter_paths(base_dir: Path, patterns: Sequence[str]) -> Iterator[Path]:
     """Yield unique paths for the given glob patterns."""
 
-    seen: set[Path] = set()
+    seen: set[str] = set()
+    base = os.fspath(base_dir)
     for pattern in patterns:
-        for path in sorted(base_dir.glob(pattern)):
-            if not path.is_file():
-                continue
+        # Same hits and order as sorted(base_dir.glob(pattern)) filtered with
+        # is_file(), but matched on scandir entries, whose cached file types
+        # spare a stat() per candidate, and sorted as strings so only the hits
+        # become Path objects.
+        hits = _glob_files(base, tuple(pattern.split("/")))
+        for path in sorted(hits, key=_path_sort_key):
             if path in seen:
                 continue
             seen.add(path)
-            yield path
+            yield Path(path)
+
+
+def _path_sort_key(path: str) -> list[str]:
+    # Paths order by their components, so "a/x" sorts before "a-b/x".
+    return os.path.normcase(path).split(os.sep)
+
+
+def _glob_files(directory: str, segments: tuple[str, ...]) -> Iterator[str]:
+    segment, rest = segments[0], segments[1:]
+    if segment == "**":
+        if not rest:
+            return
+        # Like pathlib, "**" matches zero or more directories and does not
+        # descend into symlinked ones.
+        if len(rest) == 1 and _has_magic(rest[0]):
+            # "**/*.jsonl": match file names during the walk itself instead of
+            # listing every directory a second time.
+            yield from _walk_files(directory, _segment_matcher(rest[0]))
+            return
+        for subdir in _walk_dirs(directory):
+            yield from _glob_files(subdir, rest)
+        return
+    if not _has_magic(segment):
+        path = os.path.join(directory, segment)
+        if not rest:
+            if os.path.isfile(path):
+                yield path
+        elif os.path.isdir(path):
+            yield from _glob_files(path, rest)
+        return
+    match = _segment_matcher(segment)
+    try:
+        with os.scandir(directory) as entries:
+            hits = [
+                entry.path
+                for entry in entries
+                if match(entry.name) and (entry.is_dir() if rest else entry.is_file())
+            ]
+    except OSError:
+        return
+    if not rest:
+        yield from hits
+        return
+    for path in hits:
+        yield from _glob_files(path, rest)
+
+
+def _walk_dirs(directory: str) -> Iterator[str]:
+    yield directory
+    try:
+        with os.scandir(directory) as entries:
+            subdirs = [entry.path for entry in entries if entry.is_dir() and not entry.is_symlink()]
+    except OSError:
+        return
+    for subdir in subdirs:
+        yield from _walk_dirs(subdir)
+
+
+def _walk_files(directory: str, match: Callable[[str], object]) -> Iterator[str]:
+    hits: list[str] = []
+    subdirs: list[str] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if match(entry.name) and entry.is_file():
+                    hits.append(entry.path)
+                elif entry.is_dir() and not entry.is_symlink():
+                    subdirs.append(entry.path)
+    except OSError:
+        return
+    yield from hits
+    for subdir in subdirs:
+        yield from _walk_files(subdir, match)
+
+
+def _has_magic(segment: str) -> bool:
+    return any(char in segment for char in "*?[")
+
+
+@functools.lru_cache(maxsize=64)
+def _segment_matcher(segment: str) -> Callable[[str], object]:
+    suffix = segment[1:]
+    if segment.startswith("*") and not _has_magic(suffix) and os.name != "nt":
+        # "*.jsonl" and the like: a case-sensitive suffix test.
+        return lambda name: name.endswith(suffix)
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    return re.compile(fnmatch.translate(segment), flags).match
 
 
 @dataclass
@@ -0,0 +1,105 @@
+"""
+Opt-in process pool for parsing session files on several CPU cores.
+
+Parsing and normalizing transcripts is pure Python and holds the GIL, so
+threads cannot spread it out. When ``AGENT_SESSIONS_PARSE_WORKERS`` is set to
+two or more, providers that declare ``parallel_safe`` hand their uncached
+files to worker processes instead.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .logging import debug_warning
+
+if TYPE_CHECKING:
+    from ..model import SessionRecord
+    from .base import SessionProvider
+
+PARSE_WORKERS_ENV = "AGENT_SESSIONS_PARSE_WORKERS"
+# Below this many files, shipping work to other processes costs more than it saves.
+MIN_PARALLEL_FILES = 4
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+# Worker-side provider instances, reused so per-provider lookups stay warm.
+_WORKER_PROVIDERS: dict[tuple[type[SessionProvider], Path], SessionProvider] = {}
+
+
+def parse_workers() -> int:
+    """Number of parse processes requested via the environment (0 when off)."""
+    value = os.getenv(PARSE_WORKERS_ENV, "").strip()
+    if not value:
+        return 0
+    try:
+        workers = int(value)
+    except ValueError:
+        return 0
+    return workers if workers > 1 else 0
+
+
+def parse_in_processes(
+    provider: SessionProvider, paths: Sequence[Path], workers: int
+) -> list[SessionRecord | None] | None:
+    """
+    Build ``paths`` with ``provider``'s parser in worker processes, in order.
+
+    Returns None when the pool cannot be used (e.g. the provider class is not
+    importable by the workers); callers then parse in-process.
+    """
+    jobs = [(type(provider), provider.base_dir, path) for path in paths]
+    chunksize = max(1, len(jobs) // (workers * 4))
+    pool = _pool(workers)
+    try:
+        return list(pool.map(_build_in_worker, jobs, chunksize=chunksize))
+    except Exception as exc:
+        debug_warning(f"Provider {provider.name} parse pool unavailable", exc)
+        _discard_pool(pool)
+        return None
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            # Spawned workers do not inherit the locks held by this process's
+            # provider and cache threads, which fork could copy mid-operation.
+            _POOL = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    # A worker crash breaks the whole pool; start a fresh one next time.
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _build_in_worker(job: tuple[type[SessionProvider], Path, Path]) -> SessionRecord | None:
+    provider_cls, base_dir, path = job
+    try:
+        provider = _WORKER_PROVIDERS.get((provider_cls, base_dir))
+        if provider is None:
+            provider = provider_cls(base_dir)
+            _WORKER_PROVIDERS[(provider_cls, base_dir)] = provider
+        return provider._build_session_from_path(path)
+    except Exception as exc:
+        # One bad file must not fail the whole batch and discard the pool.
+        debug_warning(f"Failed to parse {path} in a worker process", exc)
+        return None
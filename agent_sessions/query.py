@@ -7,7 +7,7 @@ from __future__ import annotations
 from collections.abc import Iterable, Sequence
 from dataclasses import dataclass, field
 
-from .model import SessionRecord
+from .model import SessionRecord, SessionSearchIndex
 from .util import strip_private_use
 
 ORDER_UPDATED_AT = "updated_at"
@@ -79,6 +79,19 @@ class SessionQuery:
             exclude_working_dirs=exclude_dirs,
         )
 
+    @property
+    def is_empty_filter(self) -> bool:
+        """True when apply_filters() would keep every session."""
+        return not (
+            self.providers
+            or self.search
+            or self.model_exact
+            or self.model_prefixes
+            or self.model_provider
+            or self.include_working_dirs
+            or self.exclude_working_dirs
+        )
+
 
 @dataclass
 class SessionPage:
@@ -117,15 +130,18 @@ def matches_working_dir(
     return True
 
 
-def matches_search(session: SessionRecord, term: str) -> bool:
+def matches_search(session: SessionRecord, term: str | bytes) -> bool:
+    """
+    Match ``term`` against the session's search index.
+
+    ``term`` may also be the output of ``SessionSearchIndex.build_term`` so a
+    filter pass prepares it once rather than once per session.
+    """
     if not term:
         return True
-    lowered = term.lower()
+    lowered = SessionSearchIndex.build_term(term) if isinstance(term, str) else term
 
-    index = getattr(session, "search_index", None)
-    if index is None:
-        index = session.refresh_search_index()
-    return index.matches(lowered)
+    return session.search_index.matches(lowered)
 
 
 def matches_model(
@@ -170,11 +186,12 @@ def sort_sessions(sessions: Sequence[SessionRecord], order: str) -> list[Session
 
 
 def apply_filters(sessions: Iterable[SessionRecord], query: SessionQuery) -> list[SessionRecord]:
+    search = SessionSearchIndex.build_term(query.search)
     return [
         session
         for session in sessions
         if matches_provider(session, query.providers)
-        and matches_search(session, query.search)
+        and matches_search(session, search)
         and matches_model(
             session,
             query.model_exact,
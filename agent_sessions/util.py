@@ -4,11 +4,50 @@ Utility helpers shared across providers and the UI.
 
 from __future__ import annotations
 
+import functools
+import json
+import re
+import sys
 from collections.abc import Iterable
 from datetime import datetime, timezone
 from typing import Any
 
-_PRIVATE_USE_TABLE = dict.fromkeys(range(0xE000, 0xF900), None)
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+# Private-use characters only occur in non-ASCII text; for that, a regex
+# substitution beats str.translate, which falls back to a per-character
+# mapping lookup once the input leaves ASCII.
+_PRIVATE_USE_RE = re.compile("[\ue000-\uf8ff]+")
+
+# orjson parses integers beyond the 64-bit range as floats. Input with a run of
+# 19 or more digits anywhere is rare, so it simply goes to the stdlib parser.
+# The run is found by mapping digits to "0" and everything else to " ", which
+# bytes.translate does far faster than a regex scan.
+_DIGIT_MASK = bytes(0x30 if 0x30 <= byte <= 0x39 else 0x20 for byte in range(256))
+_LONG_DIGITS = b"0" * 19
+
+# Strings are only worth decoding as JSON when they open like a container.
+_JSON_START = re.compile(r"\s*[{\[]")
+
+# Canonical instances of the fixed role and part-kind labels. Decoded labels
+# are mapped onto these so every message shares one string per label.
+_LABELS = {
+    label: sys.intern(label)
+    for label in (
+        "system",
+        "user",
+        "assistant",
+        "tool",
+        "event",
+        "text",
+        "code",
+        "tool-call",
+        "tool-result",
+    )
+}
 
 
 def parse_timestamp(value: Any) -> datetime | None:
@@ -30,21 +69,28 @@ def parse_timestamp(value: Any) -> datetime | None:
             return None
 
     if isinstance(value, str):
-        cleaned = value.strip()
-        if not cleaned:
-            return None
-        # Coerce trailing Z if missing timezone
-        if cleaned.endswith("Z"):
-            cleaned = cleaned[:-1] + "+00:00"
-        try:
-            return datetime.fromisoformat(cleaned)
-        except ValueError:
-            pass
+        return _parse_iso_timestamp(value)
 
     # unrecognised format
     return None
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_timestamp(value: str) -> datetime | None:
+    # The same stamps recur across a session's events and store rows, and
+    # datetimes are immutable, so parsed values can be shared.
+    cleaned = value.strip()
+    if not cleaned:
+        return None
+    # Coerce trailing Z if missing timezone
+    if cleaned.endswith("Z"):
+        cleaned = cleaned[:-1] + "+00:00"
+    try:
+        return datetime.fromisoformat(cleaned)
+    except ValueError:
+        return None
+
+
 def stringify_content(content: Any) -> str:
     """
     Flatten content blobs from various provider formats into human readable text.
@@ -84,4 +130,108 @@ def strip_private_use(text: str | None) -> str:
     """Remove private-use Unicode characters (e.g., citation markers) from text."""
     if not text:
         return ""
-    return text.translate(_PRIVATE_USE_TABLE)
+    if text.isascii():
+        return text
+    return _PRIVATE_USE_RE.sub("", text)
+
+
+def strip_private_use_lower(text: str | None) -> str:
+    """Lowercase ``text`` and drop private-use characters, skipping the strip for ASCII."""
+    if not text:
+        return ""
+    lowered = text.lower()
+    if lowered.isascii():
+        return lowered
+    return _PRIVATE_USE_RE.sub("", lowered)
+
+
+def intern_labels(values: list[str]) -> list[str]:
+    """Swap known role and part-kind labels for their shared instances."""
+    return list(map(_LABELS.get, values, values))
+
+
+def intern_names(values: list[Any]) -> list[Any]:
+    """Intern the strings in ``values`` (e.g. recurring tool names), keeping other items."""
+    return [sys.intern(value) if type(value) is str else value for value in values]
+
+
+def safe_json(value: Any) -> str:
+    """
+    Render a tool argument or output payload as compact JSON text.
+
+    Strings pass through, ``None`` becomes ``""`` and unserializable values
+    fall back to ``str()``. The output is stable across installs, which makes
+    it suitable for hashed message ids.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return _dump_json(value)
+
+
+def render_json(value: Any) -> str:
+    """
+    Like ``safe_json``, but rendered with orjson when it is installed.
+
+    orjson formats some floats differently (``1e-5`` rather than ``1e-05``),
+    so use this only for display and search text, never for hashed ids.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return _render_fast(value)
+
+
+def parse_json(raw: str | bytes) -> Any:
+    """
+    Parse JSON text with orjson when it is installed, else with ``json.loads``.
+
+    Input orjson rejects or would parse differently (``NaN``, lone surrogates,
+    huge integers) is handed to ``json.loads``, so results always match it.
+    Raises ``ValueError`` for invalid input.
+    """
+    if orjson is not None:
+        data = raw if isinstance(raw, bytes) else raw.encode("utf-8", "surrogatepass")
+        if _LONG_DIGITS not in data.translate(_DIGIT_MASK):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+    return json.loads(raw)
+
+
+def maybe_json(value: str) -> Any | None:
+    """
+    Decode ``value`` if it holds a JSON object or array, else return None.
+
+    Plain text is rejected by a regex match at the start of the string, so it
+    is never stripped or copied.
+    """
+    match = _JSON_START.match(value)
+    if match is None:
+        return None
+    candidate = value[match.end() - 1 :]
+    if candidate[-1].isspace():
+        candidate = candidate.rstrip()
+    try:
+        return parse_json(candidate)
+    except json.JSONDecodeError:
+        return None
+
+
+def _render_fast(value: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass
+    return _dump_json(value)
+
+
+def _dump_json(value: Any) -> str:
+    try:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    except TypeError:
+        return str(value)
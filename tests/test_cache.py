@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import os
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 
+import pytest
+from agent_sessions import cache as cache_module
 from agent_sessions.cache import DiskMetadataCache, DiskSessionCache
-from agent_sessions.model import Message, SessionRecord
+from agent_sessions.model import (
+    Message,
+    NormalizationDiagnostics,
+    NormalizedMessage,
+    NormalizedPart,
+    SessionRecord,
+)
 
 
 def _write_dummy(path: Path, content: str) -> None:
@@ -41,6 +51,145 @@ def test_disk_cache_round_trip(tmp_path: Path) -> None:
     assert cached.messages[0].content == "hello"
 
 
+def test_disk_cache_round_trip_without_orjson(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(cache_module, "orjson", None)
+    session_path = tmp_path / "session.jsonl"
+    _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+
+    updated = datetime(2026, 1, 13, 1, 2, 3, tzinfo=timezone.utc)
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=session_path,
+        started_at=None,
+        updated_at=updated,
+        working_dir=None,
+        model=None,
+        messages=[Message(role="user", content="héllo", created_at=updated)],
+    )
+
+    cache = DiskSessionCache(tmp_path, enabled=True)
+    cache.store(record.provider, session_path, record)
+    cache.persist()
+
+    fresh_cache = DiskSessionCache(tmp_path, enabled=True)
+    fresh_cache.load()
+    cached = fresh_cache.lookup(record.provider, session_path)
+
+    assert cached is not None
+    assert cached.updated_at == updated
+    assert cached.messages[0].content == "héllo"
+    assert cached.messages[0].created_at == updated
+
+
+def test_disk_cache_round_trips_normalized_parts(tmp_path: Path) -> None:
+    session_path = tmp_path / "session.jsonl"
+    _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+
+    parts = [
+        NormalizedPart(kind="text", text="run it"),
+        NormalizedPart(
+            kind="tool-call",
+            tool_name="shell",
+            arguments={"cmd": ["ls", "-la"]},
+            id="call-1",
+        ),
+        NormalizedPart(kind="tool-result", output="ok", id="call-1"),
+        NormalizedPart(kind="code", text="print(1)", language="python"),
+    ]
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=session_path,
+        started_at=None,
+        updated_at=None,
+        working_dir=None,
+        model=None,
+        messages=[],
+        normalized_messages=[NormalizedMessage(id="m1", role="assistant", parts=parts)],
+    )
+
+    cache = DiskSessionCache(tmp_path, enabled=True)
+    cache.store(record.provider, session_path, record)
+    cache.persist()
+
+    fresh_cache = DiskSessionCache(tmp_path, enabled=True)
+    fresh_cache.load()
+    cached = fresh_cache.lookup(record.provider, session_path)
+
+    assert cached is not None
+    assert cached.normalized_messages[0].parts == parts
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_disk_cache_stringifies_unserializable_values(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, use_orjson: bool
+) -> None:
+    if not use_orjson:
+        monkeypatch.setattr(cache_module, "orjson", None)
+    session_path = tmp_path / "session.jsonl"
+    _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=session_path,
+        started_at=None,
+        updated_at=None,
+        working_dir=None,
+        model=None,
+        messages=[],
+        normalized_messages=[
+            NormalizedMessage(
+                id="m1",
+                role="assistant",
+                parts=[
+                    NormalizedPart(
+                        kind="tool-call",
+                        tool_name="shell",
+                        arguments={"cmd": "ls", "path": Path("/tmp")},
+                    )
+                ],
+                provider_meta={"tags": ["a"], "counts": {1: "one", ("a", "b"): "pair"}},
+            )
+        ],
+    )
+
+    cache = DiskSessionCache(tmp_path, enabled=True)
+    cache.store(record.provider, session_path, record)
+    cache.persist()
+
+    fresh_cache = DiskSessionCache(tmp_path, enabled=True)
+    fresh_cache.load()
+    cached = fresh_cache.lookup(record.provider, session_path)
+
+    assert cached is not None
+    message = cached.normalized_messages[0]
+    assert message.parts[0].arguments == {"cmd": "ls", "path": "/tmp"}
+    assert message.provider_meta == {
+        "tags": ["a"],
+        "counts": {"1": "one", "('a', 'b')": "pair"},
+    }
+
+
+def test_batch_fingerprints_matches_individual_stats(tmp_path: Path) -> None:
+    paths = []
+    for directory in ("a", "b", "c"):
+        (tmp_path / directory).mkdir()
+        for name in ("one.jsonl", "two.jsonl"):
+            path = tmp_path / directory / name
+            _write_dummy(path, directory + name)
+            paths.append(path)
+    missing = tmp_path / "a" / "missing.jsonl"
+    missing_dir = tmp_path / "gone" / "session.jsonl"
+
+    fingerprints = cache_module.batch_fingerprints([*paths, missing, missing_dir])
+
+    assert fingerprints == {str(path): cache_module.path_fingerprint(path) for path in paths}
+
+
 def test_disk_cache_miss_on_change(tmp_path: Path) -> None:
     session_path = tmp_path / "session.jsonl"
     _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
@@ -69,6 +218,353 @@ def test_disk_cache_miss_on_change(tmp_path: Path) -> None:
     assert cached is None
 
 
+def test_disk_cache_reuses_decoded_records_until_source_changes(tmp_path: Path) -> None:
+    session_path = tmp_path / "session.jsonl"
+    _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=session_path,
+        started_at=None,
+        updated_at=None,
+        working_dir=None,
+        messages=[Message(role="user", content="hello")],
+    )
+    cache = DiskSessionCache(tmp_path, enabled=True)
+    cache.store(record.provider, session_path, record)
+    cache.persist()
+    assert cache.lookup(record.provider, session_path) is record
+
+    fresh_cache = DiskSessionCache(tmp_path, enabled=True)
+    fresh_cache.load()
+    decoded = fresh_cache.lookup(record.provider, session_path)
+    assert decoded == record
+    assert fresh_cache.lookup(record.provider, session_path) is decoded
+
+    _write_dummy(session_path, '{"type":"message","content":"changed!"}\n')
+    assert fresh_cache.lookup(record.provider, session_path) is None
+
+
+def test_disk_cache_hit_on_touch_with_same_content(tmp_path: Path) -> None:
+    session_path = tmp_path / "session.jsonl"
+    _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=session_path,
+        started_at=None,
+        updated_at=None,
+        working_dir=None,
+        model=None,
+        messages=[Message(role="user", content="hello", created_at=None)],
+    )
+
+    cache = DiskSessionCache(tmp_path, enabled=True)
+    cache.store(record.provider, session_path, record)
+    cache.persist()
+
+    stat = session_path.stat()
+    os.utime(session_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    fresh_cache = DiskSessionCache(tmp_path, enabled=True)
+    fresh_cache.load()
+    cached = fresh_cache.lookup(record.provider, session_path)
+    assert cached is not None
+    assert cached.session_id == "abc123"
+
+    fresh_cache.persist()
+    reloaded = DiskSessionCache(tmp_path, enabled=True)
+    reloaded.load()
+    entry = next(iter(reloaded._entries.values()))
+    assert entry["mtime_ns"] == session_path.stat().st_mtime_ns
+
+
+def test_disk_cache_persist_only_rewrites_changed_shards(tmp_path: Path) -> None:
+    paths = []
+    for name in ("a", "b"):
+        session_path = tmp_path / f"{name}.jsonl"
+        _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+        paths.append(session_path)
+
+    cache = DiskSessionCache(tmp_path / "cache", enabled=True)
+    for session_path in paths:
+        record = SessionRecord(
+            provider="openai-codex",
+            session_id=session_path.stem,
+            source_path=session_path,
+            started_at=None,
+            updated_at=None,
+            working_dir=None,
+            model=None,
+            messages=[Message(role="user", content="hello", created_at=None)],
+        )
+        cache.store(record.provider, session_path, record)
+    cache.persist()
+
+    shards = sorted(cache.entries_dir.rglob("*.json.z"))
+    assert len(shards) == 2
+    before = {shard: shard.stat().st_mtime_ns for shard in shards}
+    index_mtime = cache.cache_path.stat().st_mtime_ns
+
+    cache.persist()
+
+    assert {shard: shard.stat().st_mtime_ns for shard in shards} == before
+    assert cache.cache_path.stat().st_mtime_ns == index_mtime
+
+    fresh_cache = DiskSessionCache(tmp_path / "cache", enabled=True)
+    fresh_cache.load()
+    cached = fresh_cache.lookup("openai-codex", paths[1])
+    assert cached is not None
+    assert cached.session_id == "b"
+
+
+def test_disk_cache_index_appends_updates(tmp_path: Path) -> None:
+    session_path = tmp_path / "session.jsonl"
+    _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+
+    def make_record(session_id: str) -> SessionRecord:
+        return SessionRecord(
+            provider="openai-codex",
+            session_id=session_id,
+            source_path=session_path,
+            started_at=None,
+            updated_at=None,
+            working_dir=None,
+            model=None,
+            messages=[Message(role="user", content="hello", created_at=None)],
+        )
+
+    cache = DiskSessionCache(tmp_path, enabled=True)
+    cache.store("openai-codex", session_path, make_record("first"))
+    cache.persist()
+    assert len(cache.cache_path.read_bytes().splitlines()) == 2
+
+    _write_dummy(session_path, '{"type":"message","content":"hi again"}\n')
+    reopened = DiskSessionCache(tmp_path, enabled=True)
+    reopened.load()
+    reopened.store("openai-codex", session_path, make_record("second"))
+    reopened.persist()
+    assert len(reopened.cache_path.read_bytes().splitlines()) == 3
+
+    fresh_cache = DiskSessionCache(tmp_path, enabled=True)
+    fresh_cache.load()
+    cached = fresh_cache.lookup("openai-codex", session_path)
+    assert cached is not None
+    assert cached.session_id == "second"
+
+
+def _codex_record(session_id: str, source_path: Path) -> SessionRecord:
+    return SessionRecord(
+        provider="openai-codex",
+        session_id=session_id,
+        source_path=source_path,
+        started_at=None,
+        updated_at=None,
+        working_dir=None,
+        messages=[Message(role="user", content="hello")],
+    )
+
+
+def test_disk_cache_refresh_reads_entries_from_other_writers(tmp_path: Path) -> None:
+    first_path = tmp_path / "first.jsonl"
+    second_path = tmp_path / "second.jsonl"
+    local_path = tmp_path / "local.jsonl"
+    for path in (first_path, second_path, local_path):
+        _write_dummy(path, '{"type":"message"}\n')
+
+    server = DiskSessionCache(tmp_path, enabled=True)
+    server.store("openai-codex", first_path, _codex_record("first", first_path))
+    server.persist()
+    assert server.refresh() is False
+
+    cli = DiskSessionCache(tmp_path, enabled=True)
+    cli.load()
+    cli.store("openai-codex", second_path, _codex_record("second", second_path))
+    cli.persist()
+
+    server.store("openai-codex", local_path, _codex_record("local", local_path))
+    assert server.refresh() is True
+    assert server.refresh() is False
+    cached = server.lookup("openai-codex", second_path)
+    assert cached is not None and cached.session_id == "second"
+    server.persist()
+
+    reopened = DiskSessionCache(tmp_path, enabled=True)
+    reopened.load()
+    for path, session_id in ((first_path, "first"), (second_path, "second"), (local_path, "local")):
+        cached = reopened.lookup("openai-codex", path)
+        assert cached is not None and cached.session_id == session_id
+
+
+def test_disk_cache_lookup_replaces_entry_on_touch(tmp_path: Path) -> None:
+    source = tmp_path / "touched.jsonl"
+    _write_dummy(source, '{"type":"message"}\n')
+    cache = DiskSessionCache(tmp_path, enabled=True)
+    cache.store("openai-codex", source, _codex_record("touched", source))
+    cache.persist()
+    key = cache._entry_key("openai-codex", str(source))
+    before = cache._entries[key]
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    cache._records.clear()
+
+    cached = cache.lookup("openai-codex", source)
+
+    assert cached is not None and cached.session_id == "touched"
+    after = cache._entries[key]
+    assert after is not before
+    assert before["mtime_ns"] == stat.st_mtime_ns
+    assert after["mtime_ns"] == stat.st_mtime_ns + 1_000_000_000
+    assert key in cache._index_pending
+
+
+def test_disk_cache_retain_drops_vanished_sources(tmp_path: Path) -> None:
+    kept_path = tmp_path / "kept.jsonl"
+    gone_path = tmp_path / "gone.jsonl"
+    other_path = tmp_path / "other.jsonl"
+    for path in (kept_path, gone_path, other_path):
+        _write_dummy(path, '{"type":"message"}\n')
+    cache = DiskSessionCache(tmp_path, enabled=True)
+    cache.store("openai-codex", kept_path, _codex_record("kept", kept_path))
+    cache.store("openai-codex", gone_path, _codex_record("gone", gone_path))
+    cache.store("claude-code", other_path, _codex_record("other", other_path))
+    cache.persist()
+
+    cache.retain({"openai-codex": {str(kept_path)}})
+
+    assert cache.lookup("openai-codex", kept_path) is not None
+    assert cache.lookup("openai-codex", gone_path) is None
+    assert cache.lookup("claude-code", other_path) is not None
+    assert not any(key.endswith("gone.jsonl") for key in cache._records)
+
+
+def test_disk_cache_prime_reuses_fingerprints(tmp_path: Path) -> None:
+    session_path = tmp_path / "session.jsonl"
+    _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=session_path,
+        started_at=None,
+        updated_at=None,
+        working_dir=None,
+        model=None,
+        messages=[Message(role="user", content="hello", created_at=None)],
+    )
+
+    cache = DiskSessionCache(tmp_path / "cache", enabled=True)
+    cache.prime([session_path, tmp_path / "missing.jsonl"])
+    stat = session_path.stat()
+    assert cache._primed.fingerprints == {str(session_path): (stat.st_mtime_ns, stat.st_size)}
+
+    cache.store(record.provider, session_path, record)
+    assert cache.lookup(record.provider, session_path) is not None
+
+    cache.discard_primed()
+    assert cache._primed.fingerprints == {}
+
+
+def test_disk_cache_prime_reads_ahead_only_uncached_sources(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cached_path = tmp_path / "cached.jsonl"
+    fresh_path = tmp_path / "fresh.jsonl"
+    _write_dummy(cached_path, '{"type":"message","content":"hi"}\n')
+    _write_dummy(fresh_path, '{"type":"message","content":"new"}\n')
+
+    cache = DiskSessionCache(tmp_path / "cache", enabled=True)
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=cached_path,
+        started_at=None,
+        updated_at=None,
+        working_dir=None,
+        model=None,
+        messages=[],
+    )
+    cache.store(record.provider, cached_path, record)
+
+    advised: list[list[str]] = []
+    monkeypatch.setattr(cache_module, "readahead", lambda paths: advised.append(list(paths)))
+    cache.prime([cached_path, fresh_path], "openai-codex")
+    assert advised == [[str(fresh_path)]]
+
+    cache.prime([cached_path, fresh_path])
+    assert len(advised) == 1
+
+
+def test_readahead_caps_batch_and_skips_stat_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    advised: list[tuple[str, list[str]]] = []
+
+    def record(paths: list[str]) -> None:
+        advised.append((threading.current_thread().name, paths))
+
+    monkeypatch.setattr(cache_module, "_FADV_WILLNEED", 3)
+    monkeypatch.setattr(cache_module, "_advise_willneed", record)
+    monkeypatch.setattr(cache_module, "_READAHEAD_MAX_FILES", 3)
+    monkeypatch.setattr(cache_module, "_READAHEAD_MAX_BYTES", 100)
+
+    cache_module.readahead({"a": 10, "b": 10, "c": 10, "d": 10})
+    cache_module.readahead({"big": 60, "bigger": 60, "small": 1})
+    cache_module._readahead_pool().submit(lambda: None).result()
+
+    assert [paths for _, paths in advised] == [["a", "b", "c"], ["big"]]
+    assert all(name.startswith("agent-sessions-readahead") for name, _ in advised)
+
+
+def test_disk_cache_persist_async_writes_in_background(tmp_path: Path) -> None:
+    session_path = tmp_path / "session.jsonl"
+    _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=session_path,
+        started_at=None,
+        updated_at=None,
+        working_dir=None,
+        model=None,
+        messages=[Message(role="user", content="hello", created_at=None)],
+    )
+
+    cache = DiskSessionCache(tmp_path / "cache", enabled=True)
+    cache.store(record.provider, session_path, record)
+    cache.persist_async()
+    cache.flush(timeout=10)
+
+    fresh_cache = DiskSessionCache(tmp_path / "cache", enabled=True)
+    fresh_cache.load()
+    cached = fresh_cache.lookup(record.provider, session_path)
+    assert cached is not None
+    assert cached.session_id == "abc123"
+
+
+def test_disk_cache_store_skips_already_queued_session(tmp_path: Path) -> None:
+    session_path = tmp_path / "session.jsonl"
+    _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=session_path,
+        started_at=None,
+        updated_at=None,
+        working_dir=None,
+        model=None,
+        messages=[Message(role="user", content="hello", created_at=None)],
+    )
+
+    cache = DiskSessionCache(tmp_path / "cache", enabled=True)
+    cache.store(record.provider, session_path, record)
+    queued = next(iter(cache._dirty.values()))
+    cache.store(record.provider, session_path, record)
+
+    assert next(iter(cache._dirty.values())) is queued
+
+
 def test_disk_cache_persist_is_best_effort(tmp_path: Path) -> None:
     session_path = tmp_path / "session.jsonl"
     _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
@@ -92,7 +588,42 @@ def test_disk_cache_persist_is_best_effort(tmp_path: Path) -> None:
     cache.store(record.provider, session_path, record)
     cache.persist()
 
-    assert cache.enabled is False
+    # The failed write stays queued and in-memory lookups keep working.
+    assert cache.enabled is True
+    assert cache._dirty and cache._index_pending
+    assert cache.lookup(record.provider, session_path) is record
+
+
+def test_disk_cache_retries_a_failed_persist(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    session_path = tmp_path / "session.jsonl"
+    _write_dummy(session_path, '{"type":"message","content":"hi"}\n')
+    cache = DiskSessionCache(tmp_path / "cache", enabled=True)
+    cache.store("openai-codex", session_path, _codex_record("retry", session_path))
+
+    real_write = cache_module._atomic_write_bytes
+    failures: list[Path] = []
+
+    def fail_once(directory: Path, path: Path, data: bytes) -> bool:
+        if not failures:
+            failures.append(path)
+            return False
+        return real_write(directory, path, data)
+
+    monkeypatch.setattr(cache_module, "_atomic_write_bytes", fail_once)
+    cache.persist()
+    assert failures and not cache.cache_path.exists()
+    cache._records.clear()
+    cached = cache.lookup("openai-codex", session_path)
+    assert cached is not None and cached.session_id == "retry"
+
+    cache.persist()
+    assert not cache._dirty and not cache._index_pending
+    reopened = DiskSessionCache(tmp_path / "cache", enabled=True)
+    reopened.load()
+    cached = reopened.lookup("openai-codex", session_path)
+    assert cached is not None and cached.session_id == "retry"
 
 
 def test_metadata_cache_round_trip(tmp_path: Path) -> None:
@@ -126,6 +657,174 @@ def test_metadata_cache_round_trip(tmp_path: Path) -> None:
     assert restored.sessions[0].session_id == "abc123"
 
 
+def test_metadata_cache_round_trip_without_optional_decoders(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(cache_module, "orjson", None)
+    monkeypatch.setattr(cache_module, "cache_structs", None)
+    records = [
+        SessionRecord(
+            provider="openai-codex",
+            session_id=f"s{index}",
+            source_path=tmp_path / f"s{index}.jsonl",
+            started_at=None,
+            updated_at=None,
+            working_dir=None,
+            messages=[Message(role="user", content="hello")],
+        )
+        for index in range(3)
+    ]
+    cache = DiskMetadataCache(tmp_path, enabled=True)
+    cache.persist("cache-key", "manifest-hash", {}, records)
+
+    snapshot = DiskMetadataCache(tmp_path, enabled=True).load("cache-key").snapshot
+
+    assert snapshot is not None
+    assert snapshot.sessions == records
+
+
+def test_metadata_cache_persist_async_is_visible_to_load(tmp_path: Path) -> None:
+    cache = DiskMetadataCache(tmp_path, enabled=True)
+    manifest = {("openai-codex", "/tmp/session.jsonl"): (1, 2)}
+    future = cache.persist_async("cache-key", "manifest-hash", manifest, [])
+    manifest.clear()
+
+    load_result = DiskMetadataCache(tmp_path, enabled=True).load("cache-key")
+
+    assert future.done()
+    assert future.result().status == "hit"
+    assert load_result.snapshot is not None
+    assert load_result.snapshot.manifest == {("openai-codex", "/tmp/session.jsonl"): (1, 2)}
+
+
+def test_metadata_cache_load_reuses_unchanged_snapshot(tmp_path: Path) -> None:
+    cache = DiskMetadataCache(tmp_path, enabled=True)
+    manifest = {("openai-codex", "/tmp/session.jsonl"): (1, 2)}
+    cache.persist("cache-key", "manifest-hash", manifest, [])
+
+    first = cache.load("cache-key").snapshot
+    second = cache.load("cache-key").snapshot
+    assert first is not None
+    assert second is first
+    assert cache.load("other-key").snapshot is None
+
+    cache.persist("cache-key", "manifest-hash-2", manifest, [])
+    third = cache.load("cache-key").snapshot
+    assert third is not None
+    assert third is not first
+    assert third.manifest_hash == "manifest-hash-2"
+
+
+def test_metadata_snapshot_skips_malformed_manifest_entries() -> None:
+    payload = {
+        "version": cache_module.METADATA_CACHE_VERSION,
+        "schema_version": cache_module.METADATA_SCHEMA_VERSION,
+        "cache_key": "cache-key",
+        "manifest_hash": "manifest-hash",
+        "manifest": [
+            {"provider": "p", "source_path": "/ok", "mtime_ns": 1, "size": 2},
+            {"provider": "p", "source_path": "/missing-size", "mtime_ns": 1},
+            {"provider": "p", "source_path": "/bool", "mtime_ns": True, "size": 2},
+            {"provider": "p", "source_path": "/str", "mtime_ns": "1", "size": 2},
+            {"provider": "p", "source_path": "/huge", "mtime_ns": 2**64, "size": 2},
+            ["p", "/list", 1, 2],
+            None,
+        ],
+        "sessions": [],
+    }
+
+    snapshot, outcome, _reason = cache_module._parse_metadata_snapshot(payload, "cache-key")
+
+    assert outcome == "hit"
+    assert snapshot is not None
+    assert dict(snapshot.manifest) == {("p", "/ok"): (1, 2)}
+
+
+def test_metadata_cache_reads_single_document_snapshots(tmp_path: Path) -> None:
+    session_path = tmp_path / "session.jsonl"
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=session_path,
+        started_at=None,
+        updated_at=None,
+        working_dir=None,
+        model=None,
+        messages=[Message(role="user", content="hello", created_at=None)],
+    )
+    payload = {
+        "version": 1,
+        "schema_version": cache_module.METADATA_SCHEMA_VERSION,
+        "cache_key": "cache-key",
+        "manifest_hash": "manifest-hash",
+        "manifest": [],
+        "sessions": [cache_module.serialize_session_record(record)],
+    }
+    cache = DiskMetadataCache(tmp_path, enabled=True)
+    cache.cache_path.write_bytes(cache_module._dumps_json(payload))
+
+    result = cache.load("cache-key")
+
+    assert result.status == "hit"
+    assert result.snapshot is not None
+    assert [item.session_id for item in result.snapshot.sessions] == ["abc123"]
+
+
+def test_typed_session_decoder_matches_generic_decoder(tmp_path: Path) -> None:
+    cache_structs = pytest.importorskip("agent_sessions.cache_structs")
+    created = datetime(2026, 1, 13, 1, 2, 3, 456, tzinfo=timezone.utc)
+    record = SessionRecord(
+        provider="openai-codex",
+        session_id="abc123",
+        source_path=tmp_path / "session.jsonl",
+        started_at=datetime(2026, 1, 13),
+        updated_at=created,
+        working_dir="/tmp",
+        model="gpt-test",
+        messages=[Message(role="user", content="hello", created_at=created)],
+        normalized_messages=[
+            NormalizedMessage(
+                id="m1",
+                role="assistant",
+                parts=[
+                    NormalizedPart(kind="text", text="hi"),
+                    NormalizedPart(kind="tool-call", tool_name="shell", arguments={"cmd": "ls"}),
+                ],
+                timestamp=created,
+                latency_ms=12,
+                provider_meta={"source": "test"},
+            )
+        ],
+        normalization_diagnostics=NormalizationDiagnostics(
+            total_events=3, parsed_events=2, skipped_events=1, warnings=["odd line"]
+        ),
+    )
+    line = cache_module._dumps_json(cache_module.serialize_session_record(record))
+
+    typed = cache_structs.decode_session_record(line)
+    generic = cache_module.deserialize_session_record(cache_module._loads_json(line))
+
+    assert typed == generic
+    assert typed.normalization_diagnostics == generic.normalization_diagnostics
+
+
+def test_deserialize_session_record_tolerates_ragged_columns() -> None:
+    payload = {
+        "provider": "openai-codex",
+        "session_id": "abc123",
+        "source_path": "/tmp/session.jsonl",
+        "messages": {"role": ["user", None], "content": ["hello"], "created_at": [None, None]},
+        "normalized_messages": {"id": ["m1"], "role": ["assistant"], "latency_ms": [5]},
+    }
+
+    record = cache_module.deserialize_session_record(payload)
+
+    assert record.messages == [Message("user", "", None), Message("event", "", None)]
+    assert record.normalized_messages == [
+        NormalizedMessage(id="m1", role="assistant", parts=[], latency_ms=5.0)
+    ]
+
+
 def test_metadata_cache_load_falls_back_on_corruption(tmp_path: Path) -> None:
     cache = DiskMetadataCache(tmp_path, enabled=True)
     cache.cache_path.parent.mkdir(parents=True, exist_ok=True)
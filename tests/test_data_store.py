@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import hashlib
 import os
 import threading
 import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+import pytest
+from agent_sessions import data_store
+from agent_sessions.cache import wait_for_background_writes
 from agent_sessions.data_store import SessionService, _CacheState
 from agent_sessions.model import Message, SessionRecord
 from agent_sessions.providers.base import SessionProvider
@@ -164,7 +168,25 @@ def test_cache_state_reload_logic() -> None:
     assert state.should_reload(True, now=clock.now)
 
 
-def test_session_service_respects_refresh_interval() -> None:
+def test_manifest_hash_is_order_independent_and_stable() -> None:
+    manifest = {
+        ("stub", "/tmp/b.jsonl"): (2, 20),
+        ("stub", "/tmp/a.jsonl"): (1, 10),
+    }
+    lines = "stub\x00/tmp/a.jsonl\x001\x0010\nstub\x00/tmp/b.jsonl\x002\x0020\n"
+    expected = data_store._identity_digest(lines.encode())
+
+    assert SessionService._manifest_hash_for(manifest) == expected
+    assert SessionService._manifest_hash_for(dict(reversed(manifest.items()))) == expected
+
+
+def test_identity_digest_falls_back_to_sha256(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(data_store, "xxhash", None)
+    assert data_store._identity_digest(b"payload") == hashlib.sha256(b"payload").hexdigest()
+
+
+def test_session_service_respects_refresh_interval(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AGENT_SESSIONS_FORCE_BLOCKING_REFRESH", "1")
     records = [make_record("s1", 0)]
     provider = StubProvider(records)
     clock = FakeClock()
@@ -182,6 +204,75 @@ def test_session_service_respects_refresh_interval() -> None:
     assert provider.calls == 2
 
 
+def test_session_service_refresh_error_reaches_only_the_owner(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("AGENT_SESSIONS_FORCE_BLOCKING_REFRESH", "1")
+    provider = StubProvider([make_record("s1", 0)])
+    clock = FakeClock()
+    service = SessionService(providers=[provider], refresh_interval=10.0, clock=clock.now)
+    assert service.all_sessions()
+
+    entered = threading.Event()
+    release = threading.Event()
+    refreshes: list[str] = []
+
+    def failing_refresh(reason: str) -> None:
+        refreshes.append(reason)
+        entered.set()
+        release.wait(5)
+        raise RuntimeError("provider exploded")
+
+    monkeypatch.setattr(service, "_refresh_snapshot", failing_refresh)
+    clock.advance(11)
+
+    outcomes: dict[str, object] = {}
+
+    def _call(name: str) -> None:
+        try:
+            outcomes[name] = [record.session_id for record in service.all_sessions()]
+        except RuntimeError as exc:
+            outcomes[name] = exc
+
+    owner = threading.Thread(target=_call, args=("owner",))
+    owner.start()
+    assert entered.wait(5)
+    waiter = threading.Thread(target=_call, args=("waiter",))
+    waiter.start()
+    time.sleep(0.1)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert isinstance(outcomes["owner"], RuntimeError)
+    assert outcomes["waiter"] == ["s1"]
+    assert len(refreshes) == 1
+
+
+def test_session_service_serves_stale_snapshot_while_refreshing() -> None:
+    release = threading.Event()
+
+    class GatedProvider(StubProvider):
+        def sessions(self):
+            if self.calls:
+                release.wait(5)
+            return super().sessions()
+
+    provider = GatedProvider([make_record("s1", 0)])
+    clock = FakeClock()
+    service = SessionService(providers=[provider], refresh_interval=10.0, clock=clock.now)
+    assert service.all_sessions()
+
+    clock.advance(11)
+    assert [record.session_id for record in service.all_sessions()] == ["s1"]
+    refresh = service._refresh_future
+    assert refresh is not None and not refresh.done()
+
+    release.set()
+    refresh.result(timeout=5)
+    assert provider.calls == 2
+
+
 def test_session_service_list_sessions_paginates_and_sorts() -> None:
     records = [
         make_record("s1", 0),
@@ -204,6 +295,48 @@ def test_session_service_list_sessions_paginates_and_sorts() -> None:
     assert not page.has_next
 
 
+def test_session_service_list_sessions_sees_direct_loads() -> None:
+    direct = make_record("s3", 20)
+    provider = DirectLoadProvider([make_record("s1", 0), make_record("s2", 10)], direct)
+    service = SessionService(providers=[provider], refresh_interval=None)
+
+    before = service.list_sessions(SessionQuery(order="updated_at"))
+    assert [record.session_id for record in before.items] == ["s2", "s1"]
+
+    assert service.get_session(provider.name, "s3", source_path=str(direct.source_path))
+
+    after = service.list_sessions(SessionQuery(order="updated_at"))
+    assert [record.session_id for record in after.items] == ["s3", "s2", "s1"]
+
+
+def test_session_service_direct_load_replaces_snapshot_record() -> None:
+    refreshed = make_record("s1", 30)
+    provider = DirectLoadProvider([make_record("s1", 0), make_record("s2", 10)], refreshed)
+    service = SessionService(providers=[provider], refresh_interval=None)
+    service.list_sessions(SessionQuery())
+
+    assert service.get_session(provider.name, "s1", source_path=str(refreshed.source_path))
+
+    page = service.list_sessions(SessionQuery(order="updated_at"))
+    assert page.total == 2
+    assert page.items[0] is refreshed
+    assert [record.session_id for record in page.items] == ["s1", "s2"]
+
+
+def test_session_service_warms_direct_cache_once_at_startup(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    provider = StubProvider([make_record("s1", 0)])
+    service = SessionService(providers=[provider], refresh_interval=None)
+    warmups: list[bool] = []
+    monkeypatch.setattr(service, "_warm_session_cache_async", lambda: warmups.append(True))
+
+    service.list_sessions(SessionQuery())
+    service.list_sessions(SessionQuery())
+
+    assert warmups == [True]
+
+
 def test_session_service_filters_working_dirs() -> None:
     records = [
         make_record("s1", 0, working_dir="/workspace/a"),
@@ -403,6 +536,7 @@ def test_corrupted_metadata_snapshot_triggers_rebuild_and_recovers(tmp_path: Pat
     assert first_service.all_sessions()
     assert provider_a.calls == 1
 
+    wait_for_background_writes()
     cache_dir = Path(os.environ["AGENT_SESSIONS_CACHE_DIR"])
     snapshot_path = cache_dir / "metadata_snapshot.json"
     assert snapshot_path.exists()
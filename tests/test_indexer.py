@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -111,3 +112,34 @@ def test_load_sessions_ignores_provider_failures() -> None:
     )
     result = load_sessions([provider, ExplodingProvider()])
     assert [record.session_id for record in result] == ["ok"]
+
+
+def test_load_sessions_top_k_returns_most_recent() -> None:
+    records = [
+        make_record(
+            f"session-{day}",
+            updated=datetime(2024, 6, day, 10, tzinfo=timezone.utc),
+            started=datetime(2024, 6, day, 9, tzinfo=timezone.utc),
+        )
+        for day in (3, 1, 4, 2)
+    ]
+    provider = FakeProvider(records=records)
+    result = load_sessions([provider], top_k=2)
+    assert [record.session_id for record in result] == ["session-4", "session-3"]
+    assert load_sessions([provider], top_k=10) == load_sessions([provider])
+
+
+def test_load_sessions_runs_providers_concurrently() -> None:
+    barrier = threading.Barrier(2, timeout=5)
+
+    class WaitingProvider(FakeProvider):
+        def sessions(self) -> list[SessionRecord]:
+            # Only returns once both providers are scanning at the same time.
+            barrier.wait()
+            return super().sessions()
+
+    timestamp = datetime(2024, 7, 1, 10, tzinfo=timezone.utc)
+    first = WaitingProvider(records=[make_record("first", updated=timestamp, started=timestamp)])
+    second = WaitingProvider(records=[make_record("second", updated=timestamp, started=timestamp)])
+    result = load_sessions([first, second])
+    assert [record.session_id for record in result] == ["first", "second"]
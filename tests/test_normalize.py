@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -84,3 +85,16 @@ def test_normalization_diagnostics_counts_skips() -> None:
     assert diag.total_events == 2
     assert diag.parsed_events == 1
     assert diag.skipped_events == 1
+
+
+def test_generated_message_id_is_stable() -> None:
+    ts = datetime(2026, 1, 10, 12, tzinfo=timezone.utc)
+    normalizer = Normalizer(provider="unit-test")
+
+    message = normalizer.normalize_message({"role": "user", "content": "hello"}, timestamp=ts)
+
+    assert message is not None
+    # Pinned to the original field-by-field digest so cached ids stay valid.
+    fields = [b"unit-test", b"user", ts.isoformat().encode(), b"text", b"hello"]
+    stream = b"\x00".join([*fields, b"", b"", b"", b"", b"", b"0"])
+    assert message.id == f"unit-test:{hashlib.sha1(stream).hexdigest()}"
@@ -3,12 +3,18 @@
 from __future__ import annotations
 
 import json
+import sqlite3
 from pathlib import Path
 
+import pytest
+from agent_sessions import util
+from agent_sessions.providers import base as provider_base
+from agent_sessions.providers import claude, ingest
 from agent_sessions.providers.claude import ClaudeProvider
 from agent_sessions.providers.codex import CodexProvider
 from agent_sessions.providers.gemini import GeminiProvider
-from agent_sessions.providers.ingest import JsonlReader, SessionBuilder
+from agent_sessions.providers.ingest import JsonlReader, SessionBuilder, iter_paths
+from agent_sessions.providers.parallel import PARSE_WORKERS_ENV, parse_in_processes
 
 
 def _write_jsonl(path: Path, events: list[dict]) -> None:
@@ -32,6 +38,39 @@ def test_jsonl_reader_skips_invalid(tmp_path):
     assert events == [{"valid": True}, {"another": 1}]
 
 
+def test_jsonl_reader_keeps_large_integers_exact(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text('{"id": 123456789012345678901, "text": "\u00e4"}\r\n[1]\n', encoding="utf-8")
+
+    assert list(JsonlReader(path)) == [{"id": 123456789012345678901, "text": "ä"}]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_jsonl_reader_strips_unicode_whitespace_in_both_modes(tmp_path, monkeypatch, use_orjson):
+    if use_orjson:
+        if util.orjson is None:
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(ingest, "_JSONL_MODE", "rb")
+        monkeypatch.setattr(ingest, "_JSONL_ENCODING", None)
+    else:
+        monkeypatch.setattr(util, "orjson", None)
+        monkeypatch.setattr(ingest, "_JSONL_MODE", "r")
+        monkeypatch.setattr(ingest, "_JSONL_ENCODING", "utf-8")
+    path = tmp_path / "events.jsonl"
+    path.write_text(
+        '\ufeff{"bom": 1}\n'
+        '\u00a0{"nbsp": 2}\u00a0\n'
+        '{"ls": 3}\u2028\n'
+        "\u2028\u00a0\n"
+        '{"text": "a\u2028b\u00a0"}\n',
+        encoding="utf-8",
+    )
+
+    # Both modes strip Unicode whitespace around a line. A BOM is not
+    # whitespace, so that line is invalid JSON either way.
+    assert list(JsonlReader(path)) == [{"nbsp": 2}, {"ls": 3}, {"text": "a\u2028b\u00a0"}]
+
+
 def test_session_builder_deduplicates_messages(tmp_path):
     builder = SessionBuilder(
         provider="test",
@@ -162,6 +201,69 @@ def test_claude_provider_skips_empty_summary(tmp_path):
     assert len(record.normalized_messages) == 2
 
 
+def test_claude_provider_reads_store_database(tmp_path):
+    connection = sqlite3.connect(tmp_path / "__store.db")
+    connection.executescript(
+        """
+        CREATE TABLE projects (id TEXT, absolute_path TEXT, notes TEXT);
+        CREATE TABLE conversations (
+            id TEXT, project_id TEXT, created_at TEXT, updated_at TEXT, title TEXT
+        );
+        CREATE TABLE conversation_summaries (conversation_id TEXT, metadata TEXT);
+        CREATE TABLE messages (
+            conversation_id TEXT, role TEXT, author TEXT, content TEXT, created_at TEXT, blob BLOB
+        );
+        CREATE TABLE user_messages (conversation_id TEXT, text TEXT, timestamp TEXT);
+        INSERT INTO projects VALUES ('p1', '/work/one', 'unused');
+        INSERT INTO conversations VALUES
+            ('c1', 'p1', '2025-01-01T10:00:00Z', '2025-01-01T11:00:00Z', 'First'),
+            ('c2', NULL, '2025-01-02T10:00:00Z', NULL, 'Second');
+        INSERT INTO conversation_summaries VALUES ('c2', '{"workspace": {"cwd": "/work/two"}}');
+        INSERT INTO messages VALUES
+            ('c1', NULL, 'assistant', '[{"type": "text", "text": "Hi there"}]',
+             '2025-01-01T10:05:00Z', x'00'),
+            ('c2', 'assistant', NULL, 'Plain reply', '2025-01-02T10:05:00Z', NULL),
+            (NULL, 'user', NULL, 'Orphan', NULL, NULL);
+        INSERT INTO user_messages VALUES ('c1', 'Hello', '2025-01-01T10:01:00Z');
+        """
+    )
+    connection.commit()
+    connection.close()
+
+    records = {record.session_id: record for record in ClaudeProvider(tmp_path).sessions()}
+
+    assert set(records) == {"store:c1", "store:c2"}
+    first = records["store:c1"]
+    assert first.working_dir == "/work/one"
+    assert [(message.role, message.content) for message in first.messages] == [
+        ("user", "Hello"),
+        ("assistant", "Hi there"),
+    ]
+    assert first.started_at and first.started_at.hour == 10
+    assert first.updated_at and first.updated_at.hour == 11
+    second = records["store:c2"]
+    assert second.working_dir == "/work/two"
+    assert [(message.role, message.content) for message in second.messages] == [
+        ("assistant", "Plain reply")
+    ]
+
+
+def test_claude_store_schema_probes_only_known_tables():
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(
+        """
+        CREATE TABLE messages (conversation_id TEXT, content TEXT);
+        CREATE TABLE telemetry_events (id TEXT, payload TEXT);
+        """
+    )
+    probes: list[str] = []
+    connection.set_trace_callback(probes.append)
+
+    assert claude._read_schema(connection) == {"messages": {"conversation_id", "content"}}
+    assert not any("telemetry_events" in statement for statement in probes)
+    connection.close()
+
+
 def test_claude_provider_trims_session_id(tmp_path):
     base = tmp_path
     project_dir = base / "projects/-Users-sample-project"
@@ -189,6 +291,7 @@ def test_claude_provider_trims_session_id(tmp_path):
     assert len(sessions) == 1
     record = sessions[0]
     assert record.session_id == session_id
+    assert not (base / "__store.db").exists()
 
 
 def test_gemini_provider_parses_messages(tmp_path):
@@ -225,3 +328,121 @@ def test_gemini_provider_parses_messages(tmp_path):
     assert record.message_count == 2
     assert record.model == "gemini-unit-test"
     assert len(record.normalized_messages) == 2
+
+
+def test_codex_provider_parses_in_worker_processes(tmp_path, monkeypatch):
+    for day in range(1, 6):
+        _write_jsonl(
+            tmp_path / f"sessions/2025/10/0{day}/rollout-{day}.jsonl",
+            [
+                {
+                    "timestamp": f"2025-10-0{day}T15:00:00Z",
+                    "type": "session_meta",
+                    "payload": {"cwd": "/workspace/project", "model": "gpt-5-codex"},
+                },
+                {
+                    "timestamp": f"2025-10-0{day}T15:01:00Z",
+                    "type": "response_item",
+                    "payload": {
+                        "type": "message",
+                        "role": "user",
+                        "content": [{"type": "input_text", "text": f"Question {day}"}],
+                    },
+                },
+            ],
+        )
+
+    serial = list(CodexProvider(tmp_path).sessions())
+
+    batches: list[object] = []
+
+    def recording_parse(*args):
+        result = parse_in_processes(*args)
+        batches.append(result)
+        return result
+
+    monkeypatch.setattr(provider_base, "parse_in_processes", recording_parse)
+    monkeypatch.setenv(PARSE_WORKERS_ENV, "2")
+    parallel = list(CodexProvider(tmp_path).sessions())
+
+    assert len(batches) == 1 and batches[0] is not None
+    assert len(parallel) == 5
+    assert parallel == serial
+
+
+class _ExplodingCodexProvider(CodexProvider):
+    # Module level, so spawned workers can import it.
+    def handle_event(self, builder, event):
+        if event.get("type") == "explode":
+            raise RuntimeError("malformed event")
+        super().handle_event(builder, event)
+
+
+class _SerialCodexProvider(CodexProvider):
+    parallel_safe = False
+
+
+def test_worker_processes_skip_a_bad_file(tmp_path, monkeypatch):
+    for day in range(1, 6):
+        events = [
+            {
+                "timestamp": f"2025-10-0{day}T15:00:00Z",
+                "type": "response_item",
+                "payload": {
+                    "type": "message",
+                    "role": "user",
+                    "content": [{"type": "input_text", "text": f"Question {day}"}],
+                },
+            }
+        ]
+        if day == 3:
+            events.append({"type": "explode"})
+        _write_jsonl(tmp_path / f"sessions/2025/10/0{day}/rollout-{day}.jsonl", events)
+
+    batches: list[object] = []
+
+    def recording_parse(*args):
+        result = parse_in_processes(*args)
+        batches.append(result)
+        return result
+
+    monkeypatch.setattr(provider_base, "parse_in_processes", recording_parse)
+    monkeypatch.setenv(PARSE_WORKERS_ENV, "2")
+    sessions = list(_ExplodingCodexProvider(tmp_path).sessions())
+
+    assert len(batches) == 1 and batches[0] is not None
+    assert batches[0][2] is None
+    assert sorted(session.source_path.name for session in sessions) == [
+        "rollout-1.jsonl",
+        "rollout-2.jsonl",
+        "rollout-4.jsonl",
+        "rollout-5.jsonl",
+    ]
+
+    assert len(list(_SerialCodexProvider(tmp_path).sessions())) == 5
+    assert len(batches) == 1
+
+
+def test_iter_paths_matches_pathlib_glob(tmp_path):
+    for relative in (
+        "projects/a/s1.jsonl",
+        "projects/a/nested/deep/s2.jsonl",
+        "projects/a-b/s3.jsonl",
+        "projects/.hidden/s4.jsonl",
+        "projects/b/notes.json",
+        "projects/top.jsonl",
+    ):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("{}\n", encoding="utf-8")
+    (tmp_path / "projects/a/dir.jsonl").mkdir()
+    (tmp_path / "projects/link").symlink_to(tmp_path / "projects/a", target_is_directory=True)
+
+    patterns = ("projects/*/**/*.jsonl", "projects/*.jsonl", "**/s?.json*")
+    expected: list[Path] = []
+    for pattern in patterns:
+        for path in sorted(tmp_path.glob(pattern)):
+            if path.is_file() and path not in expected:
+                expected.append(path)
+
+    assert list(iter_paths(tmp_path, patterns)) == expected
@@ -5,7 +5,13 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from pathlib import Path
 
-from agent_sessions.model import Message, NormalizedMessage, NormalizedPart, SessionRecord
+from agent_sessions.model import (
+    Message,
+    NormalizedMessage,
+    NormalizedPart,
+    SessionRecord,
+    SessionSearchIndex,
+)
 from agent_sessions.query import (
     ORDER_MESSAGES,
     ORDER_UPDATED_AT,
@@ -75,6 +81,13 @@ def test_session_query_normalizes_working_dirs() -> None:
     assert normalized.exclude_working_dirs == set()
 
 
+def test_session_query_reports_empty_filter() -> None:
+    assert SessionQuery(search="  ", page=3, order=ORDER_MESSAGES).normalized().is_empty_filter
+    assert not SessionQuery(search="demo").normalized().is_empty_filter
+    assert not SessionQuery(model_provider="openai-codex").normalized().is_empty_filter
+    assert not SessionQuery(exclude_working_dirs={"/tmp"}).normalized().is_empty_filter
+
+
 def test_matches_search_scans_messages() -> None:
     timestamp = datetime(2025, 10, 7, 15, tzinfo=timezone.utc)
     session = make_session(
@@ -135,6 +148,60 @@ def test_session_record_builds_normalized_search_index() -> None:
     assert index.messages == ("hello world",)
 
 
+def test_search_index_does_not_match_across_fields() -> None:
+    timestamp = datetime(2025, 10, 7, 15, tzinfo=timezone.utc)
+    session = make_session(
+        "s1",
+        started_at=timestamp,
+        updated_at=timestamp,
+        messages=[
+            Message(role="user", content="alpha", created_at=timestamp),
+            Message(role="assistant", content="beta", created_at=timestamp),
+        ],
+    )
+
+    assert session.search_index.matches("alpha")
+    assert session.search_index.matches("beta")
+    assert not session.search_index.matches("alphabeta")
+    assert not session.search_index.matches("alpha beta")
+
+
+def test_search_index_fields_survive_separator_in_text() -> None:
+    timestamp = datetime(2025, 10, 7, 15, tzinfo=timezone.utc)
+    session = make_session(
+        "s\x1f1",
+        started_at=timestamp,
+        updated_at=timestamp,
+        messages=[
+            Message(role="user", content="alpha\x1fbeta", created_at=timestamp),
+            Message(role="assistant", content="gamma", created_at=timestamp),
+        ],
+        working_dir="/work\x1fspace",
+    )
+    index = session.refresh_search_index()
+
+    assert index.session_id == "s 1"
+    assert index.working_dir == "/work space"
+    assert index.messages == ("alpha beta", "gamma")
+    assert index.matches(SessionSearchIndex.build_term("alpha\x1fbeta"))
+    assert not index.matches(SessionSearchIndex.build_term("beta\x1fgamma"))
+
+
+def test_search_index_matches_prepared_and_non_ascii_terms() -> None:
+    timestamp = datetime(2025, 10, 7, 15, tzinfo=timezone.utc)
+    session = make_session(
+        "s1",
+        started_at=timestamp,
+        updated_at=timestamp,
+        messages=[Message(role="user", content="Grüße aus 東京 🚀", created_at=timestamp)],
+    )
+
+    assert matches_search(session, "GRÜßE")
+    assert matches_search(session, "東京")
+    assert matches_search(session, SessionSearchIndex.build_term("🚀"))
+    assert not matches_search(session, SessionSearchIndex.build_term("osaka"))
+
+
 def test_matches_search_rebuilds_missing_index() -> None:
     timestamp = datetime(2025, 10, 7, 15, tzinfo=timezone.utc)
     session = make_session(
@@ -149,6 +216,21 @@ def test_matches_search_rebuilds_missing_index() -> None:
     assert matches_search(session, "hello")
 
 
+def test_search_index_is_built_on_first_use() -> None:
+    timestamp = datetime(2025, 10, 7, 15, tzinfo=timezone.utc)
+    session = make_session(
+        "s1",
+        started_at=timestamp,
+        updated_at=timestamp,
+        messages=[Message(role="assistant", content="Hello world", created_at=timestamp)],
+    )
+    assert session._search_index is None
+
+    index = session.search_index
+    assert session.search_index is index
+    assert index.matches("hello")
+
+
 def test_matches_provider_filters_by_set() -> None:
     session = make_session(
         "s1",
@@ -1,9 +1,22 @@
 """Tests for utility helper functions."""
 
+import weakref
 from datetime import datetime, timezone
 
 import pytest
-from agent_sessions.util import coalesce, parse_timestamp, stringify_content
+from agent_sessions.util import (
+    coalesce,
+    intern_labels,
+    intern_names,
+    maybe_json,
+    parse_json,
+    parse_timestamp,
+    render_json,
+    safe_json,
+    stringify_content,
+    strip_private_use,
+    strip_private_use_lower,
+)
 
 
 class TestParseTimestamp:
@@ -19,6 +32,11 @@ class TestParseTimestamp:
         result = parse_timestamp(1_700_000_000_000)
         assert result == datetime.fromtimestamp(1_700_000_000, tz=timezone.utc)
 
+    def test_repeated_strings_share_one_parse(self) -> None:
+        first = parse_timestamp("".join(["2024-06-01T08:15:30", ".250Z"]))
+        assert parse_timestamp("2024-06-01T08:15:30.250Z") is first
+        assert first == datetime(2024, 6, 1, 8, 15, 30, 250000, tzinfo=timezone.utc)
+
     @pytest.mark.parametrize("value", [None, "", "not-a-date"])
     def test_returns_none_for_invalid_inputs(self, value: object) -> None:
         assert parse_timestamp(value) is None
@@ -45,3 +63,86 @@ class TestCoalesce:
 
     def test_returns_none_when_all_empty(self) -> None:
         assert coalesce(None, "", "   ") is None
+
+
+class TestStripPrivateUse:
+    def test_removes_private_use_characters(self) -> None:
+        assert strip_private_use("see \ue200cite\ue201 Café") == "see cite Café"
+
+    def test_returns_ascii_unchanged(self) -> None:
+        assert strip_private_use("Plain ASCII") == "Plain ASCII"
+
+    def test_lower_variant_strips_and_lowercases(self) -> None:
+        assert strip_private_use_lower("\ue200Ünïcode\uf8ff MIX") == "ünïcode mix"
+        assert strip_private_use_lower("ASCII Only") == "ascii only"
+        assert strip_private_use_lower(None) == ""
+
+
+class TestSafeJson:
+    def test_renders_compact_json_and_passes_strings(self) -> None:
+        assert safe_json({"path": "ä.txt", "n": [1, 2]}) == '{"path":"ä.txt","n":[1,2]}'
+        assert safe_json("raw") == "raw"
+        assert safe_json(None) == ""
+
+    def test_falls_back_to_str_for_unserializable_values(self) -> None:
+        assert safe_json({"when": {1, 2}}) == str({"when": {1, 2}})
+
+    def test_render_json_follows_in_place_changes(self) -> None:
+        payload = {"cmd": "ls"}
+        assert render_json(payload) == '{"cmd":"ls"}'
+        payload["cmd"] = "pwd"
+        assert render_json(payload) == '{"cmd":"pwd"}'
+
+    def test_render_json_does_not_retain_payloads(self) -> None:
+        class Payload(dict):
+            pass
+
+        payload = Payload(cmd="ls")
+        ref = weakref.ref(payload)
+        assert render_json(payload) == '{"cmd":"ls"}'
+        del payload
+        assert ref() is None
+
+    def test_render_json_matches_safe_json_for_common_payloads(self) -> None:
+        payload = {"path": "ä.txt", "lines": [1, 2], "ok": True, "none": None, 3: "x"}
+        assert render_json(payload) == safe_json(payload)
+        assert render_json({"when": {1, 2}}) == str({"when": {1, 2}})
+
+
+class TestIntern:
+    def test_intern_labels_shares_known_labels_only(self) -> None:
+        decoded = ["".join(["assis", "tant"]), "".join(["cus", "tom"])]
+        first, second = intern_labels(decoded)
+        assert first is intern_labels(["".join(["assis", "tant"])])[0]
+        assert second is decoded[1]
+
+    def test_intern_names_keeps_non_strings(self) -> None:
+        names = intern_names(["".join(["ba", "sh"]), None])
+        assert names[0] is intern_names(["".join(["ba", "sh"])])[0]
+        assert names[1] is None
+
+
+class TestParseJson:
+    def test_parses_text_and_bytes(self) -> None:
+        assert parse_json('{"a": [1, 2.5]}') == {"a": [1, 2.5]}
+        assert parse_json(b'{"path": "\xc3\xa4"}') == {"path": "ä"}
+
+    def test_matches_stdlib_for_edge_cases(self) -> None:
+        assert parse_json('{"n": 123456789012345678901}') == {"n": 123456789012345678901}
+        assert parse_json(b"[-9223372036854775809]") == [-9223372036854775809]
+        assert parse_json('{"x": NaN}')["x"] != parse_json('{"x": NaN}')["x"]
+        assert parse_json('"\\ud800"') == "\ud800"
+
+    def test_maybe_json_decodes_only_containers(self) -> None:
+        assert maybe_json(' \n{"a": 1}\n ') == {"a": 1}
+        assert maybe_json("[1, 2]") == [1, 2]
+        assert maybe_json("plain text") is None
+        assert maybe_json("42") is None
+        assert maybe_json("{not json") is None
+        assert maybe_json("") is None
+
+    def test_raises_value_error_for_invalid_input(self) -> None:
+        with pytest.raises(ValueError):
+            parse_json("not-json")
+        with pytest.raises(ValueError):
+            parse_json(b'{"bad": "\xff"}')